@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+batch_validate.py — validate many repos that share this mode pack in one process pool.
+Placement: project_root/.roo/mode-tools/batch_validate.py
+
+Behavior:
+- Accepts repo directories, `.roomodes` paths, or glob patterns (e.g. `~/src/*`).
+- Discovers every `.roomodes` under the given paths.
+- Loads the schema, `security_baseline.json` and `content_policy.json` once; each worker compiles them once.
+- Validates all targets in parallel and prints one aggregated JSON report.
+
+- `--opa-server` also checks every repo against security_policy.rego in one batch request to a
+  persistent OPA server (see opa_server.py); repos with deny results fail.
+
+Usage:
+  python batch_validate.py [--jobs N] [--output report.json] [--opa-server [ADDR]] REPO_OR_GLOB [...]
+"""
+import sys, os, glob, json, time, argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import validate_roomodes
+from content_policy import load_policy
+
+HERE = Path(__file__).resolve().parent
+SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__"}
+
+# Per-worker state, populated once by _init_worker
+_WORKER = {}
+
+def discover_targets(specs):
+    """Expand repo paths / globs into a sorted, de-duplicated list of `.roomodes` files."""
+    found = set()
+    for spec in specs:
+        spec = os.path.expanduser(spec)
+        paths = glob.glob(spec, recursive=True) if glob.has_magic(spec) else [spec]
+        for p in map(Path, paths):
+            if p.is_file() and p.name == ".roomodes":
+                found.add(p.resolve())
+            elif p.is_dir():
+                if (p / ".roomodes").is_file():
+                    found.add((p / ".roomodes").resolve())
+                    continue
+                for dirpath, dirnames, filenames in os.walk(p):
+                    dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+                    if ".roomodes" in filenames:
+                        found.add((Path(dirpath) / ".roomodes").resolve())
+    return sorted(found)
+
+def _init_worker(schema, baseline, policy):
+    _WORKER["validator"] = validate_roomodes.LazyValidator(schema)
+    _WORKER["baseline"] = baseline
+    _WORKER["policy"] = policy
+
+def _validate_one(target: str):
+    target = Path(target)
+    # Rules-tree checks run against the target repo's own `.roo/` tree
+    repo_tools_dir = target.parent / ".roo" / "mode-tools"
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        result = validate_roomodes.validate_target(target, _WORKER["validator"], _WORKER["baseline"], repo_tools_dir,
+                                                  policy=_WORKER["policy"])
+    except Exception as e:
+        result = {"target": str(target), "ok": False, "errors": [f"Error: {type(e).__name__}: {e}"], "warnings": []}
+    result["root"] = str(target.parent)
+    result["status"] = "pass" if result["ok"] else "fail"
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    result["cpu_ms"] = round((time.process_time() - cpu_start) * 1000, 2)
+    return result
+
+def run_batch(targets, jobs=None, script_dir: Path = HERE):
+    """Validate every target across a process pool and return the aggregated report."""
+    schema = validate_roomodes.load_schema(script_dir)
+    baseline = validate_roomodes.load_baseline(script_dir)
+    policy = load_policy(script_dir)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(schema, baseline, policy)) as pool:
+        repos = list(pool.map(_validate_one, [str(t) for t in targets]))
+    wall_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    passed = sum(1 for r in repos if r["ok"])
+    return {
+        "summary": {
+            "status": "pass" if passed == len(repos) else "fail",
+            "repos": len(repos),
+            "passed": passed,
+            "failed": len(repos) - passed,
+            "wall_ms": wall_ms,
+            # Per-repo wall time summed across workers, and worker CPU time actually spent
+            "sum_repo_ms": round(sum(r["duration_ms"] for r in repos), 2),
+            "cpu_ms": round(sum(r["cpu_ms"] for r in repos), 2),
+        },
+        "repos": repos,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate `.roomodes` across many repos in parallel")
+    parser.add_argument("paths", nargs="+", help="Repo directories, `.roomodes` files, or glob patterns")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", help="Also write the aggregated JSON report to this file")
+    parser.add_argument("--opa-server", nargs="?", const="127.0.0.1:8181", default=None, metavar="ADDR",
+                        help="Also run the OPA policy via a persistent server (default address: 127.0.0.1:8181)")
+    args = parser.parse_args(argv)
+
+    targets = discover_targets(args.paths)
+    if not targets:
+        print("Error: No `.roomodes` found under the given paths.", file=sys.stderr)
+        sys.exit(1)
+
+    report = run_batch(targets, jobs=args.jobs)
+    if args.opa_server:
+        from opa_server import OpaError, check_targets
+        try:
+            denies, errors = check_targets(targets, args.opa_server)
+        except OpaError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for repo, target in zip(report["repos"], targets):
+            if str(target) in errors:
+                # Not sent to OPA; the validation result already carries the YAML error
+                repo["policy_error"] = errors[str(target)]
+            repo["policy_deny"] = denies.get(str(target), [])
+            if (repo["policy_deny"] or "policy_error" in repo) and repo["ok"]:
+                repo["ok"], repo["status"] = False, "fail"
+                report["summary"]["passed"] -= 1
+                report["summary"]["failed"] += 1
+        report["summary"]["status"] = "fail" if report["summary"]["failed"] else "pass"
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if report["summary"]["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
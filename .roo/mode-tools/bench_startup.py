@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py — import-time, parse-time and end-to-end budget check for validate_roomodes.py.
+Placement: project_root/.roo/mode-tools/bench_startup.py
+
+Behavior:
+- import_ms: importing validate_roomodes in a fresh interpreter (yaml/jsonschema must stay deferred).
+- parse_ms: parsing the target into a `.roomodes` artifact (libyaml C loader when available).
+- cold_ms / warm_ms: full CLI runs without and with `--cache` (a cached schema verdict).
+- Each figure is the best of --repeat runs. Exits 1 when any figure exceeds its budget,
+  so CI and hooks can enforce it.
+
+Usage:
+  python bench_startup.py [--repeat 5] [--budget-import-ms 60] [--budget-parse-ms 150]
+                          [--budget-warm-ms 250] [optional_path_to_roomodes]
+"""
+import sys, json, time, argparse, subprocess
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+VALIDATOR = HERE / "validate_roomodes.py"
+
+IMPORT_PROBE = (
+    "import sys, time; t = time.perf_counter(); import validate_roomodes; "
+    "print((time.perf_counter() - t) * 1000); "
+    "print(int('yaml' in sys.modules or 'jsonschema' in sys.modules))"
+)
+
+def best_of(repeat, fn):
+    return round(min(fn() for _ in range(repeat)), 2)
+
+def measure_import():
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=HERE, check=True,
+                         stdout=subprocess.PIPE, text=True).stdout.split()
+    if out[1] != "0":
+        raise SystemExit("Error: importing validate_roomodes pulled in yaml/jsonschema eagerly.")
+    return float(out[0])
+
+def measure_run(target: Path, *extra):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(VALIDATOR), *extra, str(target)],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return (time.perf_counter() - start) * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark validate_roomodes.py start-up against a budget")
+    parser.add_argument("target", nargs="?", help="Path to `.roomodes` (default: auto-discovered project root)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-import-ms", type=float, default=60.0)
+    parser.add_argument("--budget-parse-ms", type=float, default=150.0)
+    parser.add_argument("--budget-warm-ms", type=float, default=250.0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(HERE))
+    import validate_roomodes
+
+    if args.target:
+        target = Path(args.target).resolve()
+        if target.is_dir():
+            target = target / ".roomodes"
+    else:
+        root = validate_roomodes.find_project_root(Path.cwd())
+        if root is None:
+            print("Error: Could not find project root containing `.roomodes` by walking upward from CWD.", file=sys.stderr)
+            sys.exit(1)
+        target = root / ".roomodes"
+
+    import roomodes_artifact
+    raw = validate_roomodes.read_text(target)
+    roomodes_artifact.parse("{}")  # exclude the yaml import from the parse figure
+
+    def parse_once():
+        start = time.perf_counter()
+        roomodes_artifact.parse(raw)
+        return (time.perf_counter() - start) * 1000
+
+    import yaml
+    measure_run(target, "--cache")  # prime the verdict cache for warm runs
+    results = {
+        "target": str(target),
+        "c_loader": hasattr(yaml, "CSafeLoader"),
+        "import_ms": best_of(args.repeat, measure_import),
+        "parse_ms": best_of(args.repeat, parse_once),
+        "cold_ms": best_of(args.repeat, lambda: measure_run(target)),
+        "warm_ms": best_of(args.repeat, lambda: measure_run(target, "--cache")),
+    }
+    budgets = {"import_ms": args.budget_import_ms, "parse_ms": args.budget_parse_ms, "warm_ms": args.budget_warm_ms}
+    over = {k: {"measured": results[k], "budget": b} for k, b in budgets.items() if results[k] > b}
+    results["budgets"] = budgets
+    results["over_budget"] = over
+
+    print(json.dumps(results, indent=2))
+    if over:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+content_policy.py — required/forbidden phrase policies for `.roomodes` and rules markdown.
+Placement: project_root/.roo/mode-tools/content_policy.py
+
+Behavior:
+- Policies live in `content_policy.json` next to this file, not in code.
+- Scope `customInstructions` applies to every mode's customInstructions.
+- Scope `modeRules` applies to files in each declared mode's rules directory (validate_roomodes
+  MODE_RULES_DIR, `.roo/rules/rules-<slug>/`) whose name matches the policy `files` glob.
+- Scope `rules` applies to files under `.roo/` whose relative path matches the policy `files` glob.
+- All phrases that apply to a text are compiled into one regex and the text is scanned once;
+  every hit and miss is reported with line numbers.
+"""
+import re, json
+from fnmatch import fnmatch
+from pathlib import Path
+
+BLOCKING_SEVERITIES = {"CRITICAL", "ERROR"}
+
+def load_policy(script_dir: Path):
+    policy_path = script_dir / "content_policy.json"
+    with open(policy_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class PhraseMatcher:
+    """One compiled automaton for a set of literal phrases.
+
+    A zero-width lookahead alternation is tried at every offset, so overlapping
+    phrases are all found. Alternatives are ordered longest-first; phrases that
+    are a prefix of the one matched at an offset are credited from a precomputed map.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = sorted(set(phrases), key=lambda p: (-len(p), p))
+        alts = "|".join(f"(?P<p{i}>{re.escape(p)})" for i, p in enumerate(self.phrases))
+        # The first-character class lets the engine skip offsets that cannot start any phrase
+        first = "".join(sorted({re.escape(p[0]) for p in self.phrases if p}))
+        self._regex = re.compile(f"(?=[{first}])(?=(?:{alts}))") if first else None
+        self._prefixes = {
+            f"p{i}": [q for q in self.phrases if q != p and p.startswith(q)]
+            for i, p in enumerate(self.phrases)
+        }
+
+    def scan(self, text: str):
+        """Return {phrase: [line numbers]} for every phrase found in `text`."""
+        hits = {}
+        if self._regex is None:
+            return hits
+        line, last = 1, 0
+        for m in self._regex.finditer(text):
+            line += text.count("\n", last, m.start())
+            last = m.start()
+            group = m.lastgroup
+            for phrase in [self.phrases[int(group[1:])], *self._prefixes[group]]:
+                lines = hits.setdefault(phrase, [])
+                if not lines or lines[-1] != line:
+                    lines.append(line)
+        return hits
+
+def policies_for(policy, scope: str):
+    return [p for p in policy.get("policies", []) if p.get("scope") == scope]
+
+def build_matcher(policies):
+    return PhraseMatcher([ph for p in policies for ph in p.get("required", []) + p.get("forbidden", [])])
+
+def check_text(text: str, policies, matcher: PhraseMatcher | None = None):
+    """Scan `text` once and return one finding per policy that it violates."""
+    hits = (matcher or build_matcher(policies)).scan(text)
+    findings = []
+    for p in policies:
+        missing = [ph for ph in p.get("required", []) if ph not in hits]
+        forbidden = {ph: hits[ph] for ph in p.get("forbidden", []) if ph in hits}
+        if missing or forbidden:
+            findings.append({
+                "policy": p["id"],
+                "severity": p.get("severity", "ERROR"),
+                "missing": missing,
+                "forbidden": forbidden,
+                "present": {ph: hits[ph] for ph in p.get("required", []) if ph in hits},
+                "description": p.get("description", ""),
+            })
+    return findings
+
+def shift_lines(finding, first_line: int):
+    """Re-base a finding's line numbers from the scanned text onto its file (text line 1 == first_line)."""
+    for key in ("forbidden", "present"):
+        finding[key] = {ph: [n + first_line - 1 for n in lines] for ph, lines in finding[key].items()}
+    return finding
+
+def format_issue(policy, finding):
+    parts = []
+    if finding["missing"]:
+        issue = f"{policy.get('issue', 'Missing required phrases')}: {', '.join(finding['missing'])}"
+        if finding["present"]:
+            found = ", ".join(f"'{ph}' at line(s) {', '.join(map(str, lines))}" for ph, lines in finding["present"].items())
+            issue += f" (found {found})"
+        parts.append(issue)
+    for phrase, lines in finding["forbidden"].items():
+        parts.append(f"Forbidden phrase '{phrase}' at line(s) {', '.join(map(str, lines))}")
+    return "; ".join(parts)
+
+def validate_rules_content(index, policy):
+    """Apply `rules`-scope policies to every matching markdown file in the index.
+
+    Results are memoized on the index, so long-lived callers only rescan after a rebuild.
+    """
+    memo_key = ("content_policy", json.dumps(policies_for(policy, "rules"), sort_keys=True))
+    if memo_key in index.memo:
+        return index.memo[memo_key]
+
+    errors = []
+    warnings = []
+
+    rules_policies = policies_for(policy, "rules")
+    by_id = {p["id"]: p for p in rules_policies}
+    matchers = {}
+
+    for rel_dir in sorted(index.dirs):
+        if not rel_dir.startswith("rules"):
+            continue
+        for name in sorted(index.files(rel_dir)):
+            rel_path = f"{rel_dir}/{name}"
+            applicable = [p for p in rules_policies if fnmatch(rel_path, p["files"])]
+            if not applicable:
+                continue
+            key = tuple(p["id"] for p in applicable)
+            if key not in matchers:
+                matchers[key] = build_matcher(applicable)
+            try:
+                text = index.read(rel_dir, name)
+            except Exception as e:
+                warnings.append({
+                    'mode': rel_path,
+                    'issue': f'Could not read file: {e}',
+                    'description': 'Ensure rules files are readable UTF-8'
+                })
+                continue
+            for finding in check_text(text, applicable, matchers[key]):
+                p = by_id[finding["policy"]]
+                entry = {
+                    'mode': rel_path,
+                    'issue': format_issue(p, finding),
+                    'severity': finding["severity"],
+                    'description': finding["description"],
+                }
+                (errors if finding["severity"] in BLOCKING_SEVERITIES else warnings).append(entry)
+
+    index.memo[memo_key] = (errors, warnings)
+    return errors, warnings
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+opa_server.py — persistent OPA policy server for `.roomodes` security checks.
+Placement: project_root/.roo/mode-tools/opa_server.py
+
+Behavior:
+- Starts `opa run --server` on a local address once (or reuses one already listening there) and
+  loads `security_policy.rego` plus a small batch module over the policy API. Policies are
+  re-uploaded only when their text changed, so OPA compiles them once per edit, not per check.
+- Documents go in over HTTP as the request body; nothing is written to disk. Each document is
+  evaluated as `data.security.deny with data.roomodes as <doc>`, so one POST checks any number
+  of repos without sharing state between requests.
+- The server runs detached; its pid is kept in `.roo/.cache/opa.pid` for `stop`.
+
+Usage:
+  python opa_server.py start  [--addr 127.0.0.1:8181]
+  python opa_server.py check  [--addr ...] [--cache] [REPO_OR_GLOB ...]   # starts the server if needed
+  python opa_server.py status [--addr ...]
+  python opa_server.py stop   [--addr ...]
+"""
+import os, sys, json, time, shutil, signal, argparse, subprocess
+import urllib.error, urllib.request
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_ADDR = "127.0.0.1:8181"
+PID_FILE = HERE.parent / ".cache" / "opa.pid"
+STARTUP_TIMEOUT = 10.0
+
+POLICY_ID = "roomodes/security_policy"
+BATCH_ID = "roomodes/batch"
+# v0 syntax, like security_policy.rego; `with` swaps in each document without storing it
+BATCH_MODULE = """package roomodes_batch
+
+results[id] = deny {
+    doc := input.documents[id]
+    deny := data.security.deny with data.roomodes as doc
+}
+"""
+
+class OpaError(Exception):
+    pass
+
+class OpaServer:
+    def __init__(self, addr: str = DEFAULT_ADDR, opa: str | None = None):
+        self.addr = addr
+        self.base = f"http://{addr}"
+        self.opa = opa or shutil.which("opa")
+
+    def _request(self, method: str, path: str, body=None, raw: bytes | None = None, timeout: float = 30.0):
+        data = raw if raw is not None else (json.dumps(body).encode("utf-8") if body is not None else None)
+        req = urllib.request.Request(self.base + path, data=data, method=method)
+        req.add_header("Content-Type", "text/plain" if raw is not None else "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                payload = resp.read()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise OpaError(f"OPA {method} {path} failed ({e.code}): {detail}") from None
+        except urllib.error.URLError as e:
+            raise OpaError(f"OPA {method} {path} failed: {e.reason}") from None
+        except OSError as e:
+            # Socket timeouts and resets raised while reading the response
+            raise OpaError(f"OPA {method} {path} failed: {e}") from None
+        try:
+            return json.loads(payload) if payload else {}
+        except ValueError as e:
+            raise OpaError(f"OPA {method} {path} returned invalid JSON: {e}") from None
+
+    def healthy(self) -> bool:
+        try:
+            self._request("GET", "/health", timeout=1.0)
+            return True
+        except (OSError, OpaError, ValueError):
+            return False
+
+    def _v0_flags(self):
+        """OPA 1.x defaults to Rego v1; the policies here use v0 syntax."""
+        out = subprocess.run([self.opa, "version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+        for ln in out.splitlines():
+            if ln.startswith("Version:") and not ln.split(":", 1)[1].strip().startswith("0."):
+                return ["--v0-compatible"]
+        return []
+
+    def start(self):
+        if self.healthy():
+            return False
+        if not self.opa:
+            raise OpaError("opa not found. Install from: https://www.openpolicyagent.org/docs/latest/#running-opa")
+        proc = subprocess.Popen([self.opa, "run", "--server", "--addr", self.addr, "--log-level", "error", *self._v0_flags()],
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=True)
+        PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+        PID_FILE.write_text(str(proc.pid), encoding="utf-8")
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise OpaError(f"opa exited with code {proc.returncode} while starting on {self.addr}")
+            if self.healthy():
+                return True
+            time.sleep(0.05)
+        proc.kill()
+        raise OpaError(f"opa did not become healthy on {self.addr} within {STARTUP_TIMEOUT}s")
+
+    def load_policies(self, policy_path: Path = HERE / "security_policy.rego"):
+        """Upload the policy modules, skipping any whose source is already loaded unchanged."""
+        with open(policy_path, "r", encoding="utf-8") as f:
+            wanted = {POLICY_ID: f.read(), BATCH_ID: BATCH_MODULE}
+        loaded = {p["id"]: p.get("raw") for p in self._request("GET", "/v1/policies").get("result", [])}
+        for policy_id, source in wanted.items():
+            if loaded.get(policy_id) != source:
+                self._request("PUT", f"/v1/policies/{policy_id}", raw=source.encode("utf-8"))
+
+    def ensure(self, policy_path: Path = HERE / "security_policy.rego"):
+        self.start()
+        self.load_policies(policy_path)
+        return self
+
+    def deny(self, documents: dict) -> dict:
+        """Evaluate {id: roomodes_data} in one request; returns {id: [deny messages]}."""
+        reply = self._request("POST", "/v1/data/roomodes_batch/results", {"input": {"documents": documents}})
+        results = reply.get("result", {})
+        return {doc_id: sorted(results.get(doc_id, [])) for doc_id in documents}
+
+    def stop(self) -> bool:
+        try:
+            pid = int(PID_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        PID_FILE.unlink(missing_ok=True)
+        return True
+
+def check_targets(targets, addr: str = DEFAULT_ADDR, cache: bool = False):
+    """Start or reuse the server and evaluate every `.roomodes` target in a single batch request.
+
+    Returns ({target: [deny messages]}, {target: parse error}); targets whose YAML does not parse
+    are left out of the request. With `cache`, artifacts are cached in each repo's `.roo/.cache/`.
+    """
+    from roomodes_artifact import ArtifactError, load_artifact
+    documents, errors = {}, {}
+    for target in targets:
+        try:
+            documents[str(target)] = load_artifact(target, target.parent / ".roo" / ".cache" if cache else None).data
+        except ArtifactError as e:
+            errors[str(target)] = str(e)
+    denies = OpaServer(addr).ensure().deny(documents) if documents else {}
+    return denies, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent OPA server for `.roomodes` security policy checks")
+    parser.add_argument("command", choices=["start", "check", "status", "stop"])
+    parser.add_argument("paths", nargs="*", help="Repo directories, `.roomodes` files, or glob patterns (check only)")
+    parser.add_argument("--addr", default=DEFAULT_ADDR, help=f"Listen/connect address (default: {DEFAULT_ADDR})")
+    parser.add_argument("--cache", action="store_true", help="Cache parsed artifacts in each repo's `.roo/.cache/` (check only)")
+    args = parser.parse_args(argv)
+
+    server = OpaServer(args.addr)
+    try:
+        if args.command == "start":
+            started = server.start()
+            server.load_policies()
+            print(f"{'Started' if started else 'Reusing'} OPA server on {args.addr}")
+        elif args.command == "status":
+            print(json.dumps({"addr": args.addr, "healthy": server.healthy()}))
+        elif args.command == "stop":
+            if not server.stop():
+                print(f"Error: No OPA server pid recorded in `{PID_FILE}`.", file=sys.stderr)
+                sys.exit(1)
+        else:
+            from batch_validate import discover_targets
+            from validate_roomodes import find_project_root
+            if args.paths:
+                targets = discover_targets(args.paths)
+            else:
+                root = find_project_root(Path.cwd())
+                targets = [root / ".roomodes"] if root else []
+            if not targets:
+                print("Error: No `.roomodes` found.", file=sys.stderr)
+                sys.exit(1)
+            start = time.perf_counter()
+            denies, errors = check_targets(targets, args.addr, cache=args.cache)
+            failed = sum(1 for msgs in denies.values() if msgs) + len(errors)
+            print(json.dumps({
+                "summary": {"status": "fail" if failed else "pass", "repos": len(targets), "failed": failed,
+                            "wall_ms": round((time.perf_counter() - start) * 1000, 2)},
+                "deny": denies,
+                "errors": errors,
+            }, indent=2, ensure_ascii=False))
+            if failed:
+                sys.exit(1)
+    except OpaError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
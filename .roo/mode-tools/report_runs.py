@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+report_runs.py — concurrency-safe per-run report output for summarize_mode_validation.py.
+Placement: project_root/.roo/mode-tools/report_runs.py
+
+Behavior:
+- Each run writes into a private staging directory `.roo/reports/runs/.<run_id>.tmp/` and is
+  published with one atomic directory rename to `.roo/reports/runs/<run_id>/`; readers never see
+  a half-written run. Run ids sort by start time.
+- Shared files (`latest.json`, the legacy `mode_validation_summary.{json,md}` copies and the
+  handoff payload) are replaced with write-to-temp + os.replace, per
+  `.roo/rules-code/use-safeWriteJson.md`, so they are never truncated.
+- `runs/index.jsonl` is an append-only index: each run appends one line with a single O_APPEND
+  write under a shared lock on `runs/index.lock` (appenders never wait for each other), and
+  readers skip any line that does not parse. Compaction holds the lock exclusively.
+- `latest.json` only moves forward: it is checked and replaced under an exclusive lock on
+  `latest.lock`, so a run that finishes after a later-started run has published leaves it (and
+  the shared copies written with it) alone. Run ids sort by start time.
+- Only the newest KEEP_RUNS run directories are kept; pruning also compacts the index.
+- Locks are advisory `flock`s (`msvcrt.locking` on Windows, always exclusive there).
+"""
+import os, json, shutil, secrets, datetime
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+KEEP_RUNS = 50
+INDEX_NAME = "index.jsonl"
+INDEX_LOCK = "index.lock"
+LATEST_NAME = "latest.json"
+LATEST_LOCK = "latest.lock"
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False):
+    """Hold an advisory lock on `path` (a dedicated lock file, never replaced) for the block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+def new_run_id() -> str:
+    ts = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return f"{ts}-{os.getpid()}-{secrets.token_hex(2)}"
+
+def safe_write_text(path: Path, text: str):
+    """Write via a unique temp file in the same directory, then atomically replace `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def safe_write_json(path: Path, data):
+    safe_write_text(path, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+def safe_copy(src: Path, dst: Path):
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def append_line(path: Path, record):
+    """Append one JSON line with a single O_APPEND write (no lock needed between writers)."""
+    data = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+class RunOutput:
+    """Staging directory for one run; `publish()` makes it visible atomically."""
+
+    def __init__(self, reports_dir: Path, run_id: str | None = None):
+        self.reports_dir = reports_dir
+        self.runs_dir = reports_dir / "runs"
+        self.run_id = run_id or new_run_id()
+        self.staging = self.runs_dir / f".{self.run_id}.tmp"
+        self.final = self.runs_dir / self.run_id
+        self.staging.mkdir(parents=True)
+
+    def path(self, name: str) -> Path:
+        """Where to write `name` now (staging); see `published()` for its final location."""
+        return self.staging / name
+
+    def published(self, name: str) -> Path:
+        return self.final / name
+
+    def publish(self, entry):
+        os.rename(self.staging, self.final)
+        # Shared: appends run concurrently, but never while compact_index rewrites the file
+        with file_lock(self.runs_dir / INDEX_LOCK, shared=True):
+            append_line(self.runs_dir / INDEX_NAME, {"run_id": self.run_id, **entry})
+
+    def discard(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+def update_latest(reports_dir: Path, pointer, on_latest=None) -> bool:
+    """Point latest.json at `pointer` unless a later run already did; returns True if it did.
+
+    The check and the replace happen under `latest.lock`. `on_latest()`, if given, runs under the
+    same lock when this run becomes the latest, so files written with the pointer (handoff,
+    legacy summary copies) cannot be rolled back by an older run either.
+    """
+    with file_lock(reports_dir / LATEST_LOCK):
+        current = read_latest(reports_dir)
+        current_id = current.get("run_id", "") if isinstance(current, dict) else ""
+        if current_id >= pointer["run_id"]:
+            return False
+        safe_write_json(reports_dir / LATEST_NAME, pointer)
+        if on_latest is not None:
+            on_latest()
+        return True
+
+def read_latest(reports_dir: Path):
+    try:
+        with open(reports_dir / LATEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def iter_runs(reports_dir: Path):
+    """Index entries oldest first, skipping torn or pruned entries."""
+    runs_dir = reports_dir / "runs"
+    try:
+        f = open(runs_dir / INDEX_NAME, "r", encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for ln in f:
+            try:
+                entry = json.loads(ln)
+            except ValueError:
+                continue
+            if (runs_dir / entry.get("run_id", "")).is_dir():
+                yield entry
+
+def compact_index(runs_dir: Path):
+    """Rewrite index.jsonl without entries whose run directory is gone.
+
+    Holds `index.lock` exclusively, so no append can land between reading and replacing the index.
+    """
+    path = runs_dir / INDEX_NAME
+    with file_lock(runs_dir / INDEX_LOCK):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        kept = []
+        for ln in lines:
+            try:
+                entry = json.loads(ln)
+            except ValueError:
+                continue
+            if (runs_dir / entry.get("run_id", "")).is_dir():
+                kept.append(ln + "\n")
+        if len(kept) != len(lines):
+            safe_write_text(path, "".join(kept))
+
+def prune_runs(reports_dir: Path, keep: int = KEEP_RUNS):
+    """Delete all but the newest `keep` published runs (staging dirs are left alone)."""
+    runs_dir = reports_dir / "runs"
+    runs = sorted(p for p in runs_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    removed = 0
+    for old in runs[:-keep] if keep else runs:
+        # Rename first so a concurrent reader sees the run either whole or gone
+        trash = runs_dir / f".{old.name}.{os.getpid()}.trash"
+        try:
+            os.rename(old, trash)
+        except OSError:
+            continue
+        shutil.rmtree(trash, ignore_errors=True)
+        removed += 1
+    if removed:
+        compact_index(runs_dir)
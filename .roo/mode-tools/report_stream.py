@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+report_stream.py — streaming findings store for mode validation reports.
+Placement: project_root/.roo/mode-tools/report_stream.py
+
+Behavior:
+- `FindingStream` appends each finding to a JSONL file as soon as a tool produces it,
+  keeping only per-tool counters in memory.
+- `write_sarif` and `write_markdown` render from the JSONL in a single pass, so the
+  full finding set is never held in memory at once.
+
+Finding shape (one JSON object per line):
+  {"tool": "yamllint|spectral|schema", "level": "error|warning|info", "message": "...",
+   "rule": "..."|null, "line": int|null, "col": int|null, "mode": "<slug>"|null, "raw": "..."}
+"""
+import json
+from pathlib import Path
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note", "hint": "note"}
+TOOL_URIS = {
+    "yamllint": "https://yamllint.readthedocs.io/",
+    "spectral": "https://github.com/stoplightio/spectral",
+    "schema": "https://json-schema.org/",
+}
+MD_SECTIONS = {"schema": "Schema Errors", "yamllint": "yamllint Findings", "spectral": "Spectral Findings"}
+
+class FindingStream:
+    def __init__(self, path: Path):
+        self.path = path
+        self.counts = {}
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, tool: str, level: str, message: str, rule=None, line=None, col=None, raw=None, mode=None):
+        rec = {"tool": tool, "level": level, "message": message, "rule": rule,
+               "line": line, "col": col, "mode": mode, "raw": raw if raw is not None else message}
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        by_level = self.counts.setdefault(tool, {})
+        by_level[level] = by_level.get(level, 0) + 1
+
+    def count(self, tool: str, level: str | None = None) -> int:
+        by_level = self.counts.get(tool, {})
+        return by_level.get(level, 0) if level else sum(by_level.values())
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_findings(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            if ln.strip():
+                yield json.loads(ln)
+
+def write_sarif(jsonl_path: Path, sarif_path: Path, artifact_uri: str):
+    """Stream findings into a SARIF 2.1.0 log with one run per tool (tools appear contiguously)."""
+    with open(sarif_path, "w", encoding="utf-8") as out:
+        out.write('{"$schema": %s, "version": "2.1.0", "runs": [' % json.dumps(SARIF_SCHEMA))
+        current = None
+        first_result = True
+        for item in iter_findings(jsonl_path):
+            if item["tool"] != current:
+                if current is not None:
+                    out.write("]}, ")
+                current = item["tool"]
+                driver = {"name": current, "informationUri": TOOL_URIS.get(current, "")}
+                out.write('{"tool": {"driver": %s}, "results": [' % json.dumps(driver))
+                first_result = True
+            location = {"artifactLocation": {"uri": artifact_uri}}
+            if item.get("line"):
+                location["region"] = {"startLine": item["line"], **({"startColumn": item["col"]} if item.get("col") else {})}
+            res = {
+                "level": SARIF_LEVELS.get(item["level"], "note"),
+                "message": {"text": item["message"]},
+                "locations": [{"physicalLocation": location}],
+            }
+            if item.get("rule"):
+                res["ruleId"] = item["rule"]
+            out.write(("" if first_result else ", ") + json.dumps(res, ensure_ascii=False))
+            first_result = False
+        if current is not None:
+            out.write("]}")
+        out.write("]}\n")
+
+def md_escape(s): return s.replace("<", "\\<").replace(">", "\\>")
+
+def write_markdown(jsonl_path: Path, md_path: Path, result, limit: int = 100):
+    """Render the summary header from `result`, then stream per-tool findings (first `limit` each)."""
+    summary = result["summary"]
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write(f"# Mode Validation Summary\n\n")
+        f.write(f"- **Timestamp (UTC):** {result['timestamp']}\n")
+        f.write(f"- **Target:** `{md_escape(result['target'])}`\n")
+        f.write(f"- **Status:** **{summary['status'].upper()}**\n")
+        f.write(f"- **Schema valid:** {summary['schema_valid']}\n")
+        if 'yamllint_errors' in summary:
+            f.write(f"- **yamllint:** {summary.get('yamllint_errors',0)} errors, {summary.get('yamllint_warnings',0)} warnings\n")
+        if 'spectral_issues' in summary:
+            f.write(f"- **spectral issues:** {summary.get('spectral_issues',0)}\n")
+        f.write("\n---\n\n")
+
+        current, shown, hidden = None, 0, 0
+
+        def close_section():
+            if hidden:
+                f.write(f"\n(+{hidden} more)\n\n")
+            elif current is not None:
+                f.write("\n")
+
+        for item in iter_findings(jsonl_path):
+            if item["tool"] != current:
+                close_section()
+                current, shown, hidden = item["tool"], 0, 0
+                f.write(f"## {MD_SECTIONS.get(current, current)}\n\n")
+            if shown >= limit:
+                hidden += 1
+                continue
+            shown += 1
+            msg = (item.get("message") or item.get("raw") or "").strip()
+            if current == "yamllint":
+                rule = item.get("rule") or ""
+                rule_s = f" *(rule: {rule})*" if rule else ""
+                f.write(f"- **{item.get('level','info')}** — {md_escape(msg)}{rule_s}\n")
+            else:
+                f.write(f"- {md_escape(msg)}\n")
+        close_section()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+roomodes_artifact.py — parse `.roomodes` once and share the result across every mode tool.
+Placement: project_root/.roo/mode-tools/roomodes_artifact.py
+
+Behavior:
+- Parses the YAML in a single compose+construct pass (libyaml C loader when available) and
+  records the source line of every node as a JSON pointer → line map.
+- Normalizes the data to plain JSON types so cached and fresh loads are identical.
+- Caches the artifact as JSON under `.roo/.cache/roomodes/<sha256>.json`; an unchanged file is
+  never re-parsed. validate_roomodes.py, summarize_mode_validation.py, run_all.py (OPA/conftest
+  input) and `.roo/reports/security_test.py` all load through here.
+"""
+import os, json, hashlib
+from pathlib import Path
+
+KEEP_ARTIFACTS = 8
+
+class ArtifactError(ValueError):
+    """`.roomodes` is not parseable YAML (wraps yaml.YAMLError so callers need not import yaml)."""
+
+def _escape(part) -> str:
+    return str(part).replace("~", "~0").replace("/", "~1")
+
+class RoomodesArtifact:
+    __slots__ = ("path", "raw", "digest", "data", "lines")
+
+    def __init__(self, path: Path, raw: str, digest: str, data, lines):
+        self.path = path
+        self.raw = raw
+        self.digest = digest
+        self.data = data
+        self.lines = lines
+
+    def line_for(self, parts):
+        """1-based source line for a path like ["customModes", 3, "groups"], falling back to the nearest parent."""
+        parts = list(parts)
+        while True:
+            ptr = "".join(f"/{_escape(p)}" for p in parts)
+            if ptr in self.lines:
+                return self.lines[ptr]
+            if not parts:
+                return None
+            parts.pop()
+
+def parse(raw: str):
+    """Return (data, lines) from one YAML pass, with safe_load semantics."""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)(raw)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None, {}
+        data = loader.construct_document(node)
+    except yaml.YAMLError as e:
+        raise ArtifactError(f"YAML syntax error: {e}") from e
+    finally:
+        loader.dispose()
+
+    lines = {}
+    stack = [("", node)]
+    while stack:
+        ptr, n = stack.pop()
+        lines[ptr] = n.start_mark.line + 1
+        if isinstance(n, yaml.MappingNode):
+            stack.extend((f"{ptr}/{_escape(k.value)}", v) for k, v in n.value)
+        elif isinstance(n, yaml.SequenceNode):
+            stack.extend((f"{ptr}/{i}", item) for i, item in enumerate(n.value))
+
+    # Round-trip through JSON so dates etc. normalize the same way whether fresh or cached
+    return json.loads(json.dumps(data, default=str)), lines
+
+def load_artifact(target: Path, cache_dir: Path | None = None, raw: str | None = None) -> RoomodesArtifact:
+    """Load `target` (or its already-read `raw` text), reusing the cached artifact for its content
+    hash when `cache_dir` is given. Raises ArtifactError on invalid YAML."""
+    if raw is None:
+        with open(target, "r", encoding="utf-8") as f:
+            raw = f.read()
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    cache_path = cache_dir / "roomodes" / f"{digest}.json" if cache_dir else None
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            return RoomodesArtifact(target, raw, digest, cached["data"], cached["lines"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    data, lines = parse(raw)
+    if cache_path is not None:
+        _store(cache_path, {"digest": digest, "source": str(target), "data": data, "lines": lines})
+    return RoomodesArtifact(target, raw, digest, data, lines)
+
+def _store(cache_path: Path, payload):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, cache_path)
+        # Keep only the most recent artifacts
+        old = sorted(cache_path.parent.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)[KEEP_ARTIFACTS:]
+        for p in old:
+            p.unlink(missing_ok=True)
+    except OSError:
+        pass
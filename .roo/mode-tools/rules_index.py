@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+rules_index.py — in-memory index of a project's `.roo/` tree.
+Placement: project_root/.roo/mode-tools/rules_index.py
+
+Behavior:
+- One recursive `os.scandir` walk records every file's size and mtime per directory. Only the
+  `rules*` trees are indexed; tool state (`.cache/`, `reports/`, `handoff/`, ...) is skipped so
+  its churn neither costs stats nor marks the index stale.
+- Validators query the index (exists / glob / read) instead of probing the filesystem.
+- File contents are read lazily on first access and cached.
+- `is_stale()` re-stats the recorded directories and files so long-lived callers (the
+  validation daemon) can rebuild the index only when the tree changed.
+"""
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+SKIP_DIRS = {"__pycache__"}
+# Top-level `.roo/` directories the validators read
+ROOT_DIR_PREFIX = "rules"
+
+class FileEntry:
+    __slots__ = ("path", "size", "mtime_ns", "_text")
+
+    def __init__(self, path: Path, size: int, mtime_ns: int):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._text = f.read()
+        return self._text
+
+class RulesIndex:
+    """Files per directory of `.roo/`, keyed by POSIX path relative to `.roo/` ("" is the root)."""
+
+    def __init__(self, roo_dir: Path):
+        self.roo_dir = Path(roo_dir)
+        self.dirs = {}
+        self.dir_mtimes = {}
+        # Results derived from this tree (e.g. content-policy scans), valid for the life of the index
+        self.memo = {}
+        self._walk(self.roo_dir, "")
+
+    def _walk(self, path: Path, rel: str):
+        try:
+            it = os.scandir(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        self.dir_mtimes[rel] = os.stat(path).st_mtime_ns
+        files = self.dirs[rel] = {}
+        subdirs = []
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS and (rel or entry.name.startswith(ROOT_DIR_PREFIX)):
+                        subdirs.append(entry)
+                elif entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = FileEntry(Path(entry.path), st.st_size, st.st_mtime_ns)
+        for entry in subdirs:
+            self._walk(Path(entry.path), f"{rel}/{entry.name}" if rel else entry.name)
+
+    def has_dir(self, rel: str) -> bool:
+        return rel in self.dirs
+
+    def subdirs(self, rel: str):
+        """Names of the direct child directories of `rel`, sorted."""
+        prefix = f"{rel}/" if rel else ""
+        return sorted(d[len(prefix):] for d in self.dirs
+                      if d.startswith(prefix) and d != rel and "/" not in d[len(prefix):])
+
+    def files(self, rel: str):
+        return self.dirs.get(rel, {})
+
+    def exists(self, rel: str, name: str) -> bool:
+        return name in self.dirs.get(rel, {})
+
+    def glob(self, rel: str, pattern: str):
+        """File names in `rel` matching a shell-style pattern, sorted."""
+        return sorted(n for n in self.dirs.get(rel, {}) if fnmatch(n, pattern))
+
+    def read(self, rel: str, name: str) -> str:
+        entry = self.dirs.get(rel, {}).get(name)
+        if entry is None:
+            raise FileNotFoundError(self.roo_dir / rel / name)
+        return entry.text
+
+    def is_stale(self) -> bool:
+        """True if any directory or file changed (added, removed, or modified) since the walk."""
+        if not self.dirs:
+            return self.roo_dir.is_dir()
+        try:
+            for rel, mtime_ns in self.dir_mtimes.items():
+                if os.stat(self.roo_dir / rel).st_mtime_ns != mtime_ns:
+                    return True
+            for files in self.dirs.values():
+                for entry in files.values():
+                    st = os.stat(entry.path)
+                    if st.st_mtime_ns != entry.mtime_ns or st.st_size != entry.size:
+                        return True
+        except OSError:
+            return True
+        return False
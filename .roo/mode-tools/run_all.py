@@ -3,10 +3,19 @@
 run_all.py — convenience entrypoint to validate `.roomodes` from /.roo/mode-tools.
 - Auto-discovers project root.
 - Runs: yamllint, spectral (if available), schema validator, security checks.
+- `.roomodes` is parsed once into the shared artifact (roomodes_artifact.py); conftest and OPA
+  receive it as JSON on stdin, so no temp files are written.
+- `--opa-server` checks the policy against a persistent `opa run --server` (started once or
+  reused; see opa_server.py) instead of spawning `opa eval` and recompiling the policy each run.
+
+Usage:
+  python run_all.py [--opa-server] [--opa-addr 127.0.0.1:8181]
 """
-import shutil, subprocess, sys
+import json, shutil, subprocess, sys, argparse
 from pathlib import Path
 
+from roomodes_artifact import load_artifact
+
 HERE = Path(__file__).resolve().parent
 VALIDATOR = HERE / "validate_roomodes.py"
 ROOMODES = None
@@ -18,12 +27,25 @@ def find_project_root(start: Path) -> Path | None:
             return p
     return None
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every `.roomodes` check")
+    parser.add_argument("--opa-server", action="store_true", help="Use a persistent OPA server for the policy check")
+    parser.add_argument("--opa-addr", default=None, help="OPA server address (default: 127.0.0.1:8181)")
+    args = parser.parse_args(argv)
+
     root = find_project_root(Path.cwd())
     if root is None:
         print("Error: Could not find project root (no `.roomodes` found upward from CWD).", file=sys.stderr)
         sys.exit(1)
     target = root / ".roomodes"
+    artifact = None
+
+    def roomodes_data():
+        # Parsed only for the policy engines, after the linters and validator have reported syntax errors
+        nonlocal artifact
+        if artifact is None:
+            artifact = load_artifact(target, root / ".roo" / ".cache")
+        return artifact.data
 
     # yamllint
     yamllint = shutil.which("yamllint")
@@ -49,30 +71,33 @@ def main():
     conftest = shutil.which("conftest")
     if conftest:
         print("-> conftest policy check")
-        subprocess.check_call([conftest, "test", "-p", str(HERE / "conftest-policy.yaml"), str(target)])
+        subprocess.run([conftest, "test", "--parser", "json", "-p", str(HERE / "conftest-policy.yaml"), "-"],
+                       input=json.dumps(roomodes_data()), text=True, check=True)
     else:
         print("! conftest not found; skipping. Install with: go install github.com/open-policy-agent/conftest@latest")
 
     # opa (alternative policy engine)
     opa = shutil.which("opa")
-    if opa:
+    if args.opa_server:
+        from opa_server import DEFAULT_ADDR, OpaError, OpaServer
+        print("-> opa policy check (server)")
+        try:
+            denies = OpaServer(args.opa_addr or DEFAULT_ADDR).ensure().deny({"roomodes": roomodes_data()})["roomodes"]
+        except OpaError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for msg in denies:
+            print(f"  deny: {msg}")
+        if denies:
+            sys.exit(1)
+    elif opa:
         print("-> opa policy check")
-        # Create temporary data file for OPA
-        import json
-        import yaml
-        with open(target, 'r') as f:
-            roomodes_data = yaml.safe_load(f)
-        with open(HERE / "temp_roomodes.json", 'w') as f:
-            json.dump({"roomodes": roomodes_data}, f)
-
-        subprocess.check_call([
+        subprocess.run([
             opa, "eval",
             "--data", str(HERE / "security_policy.rego"),
-            "--input", str(HERE / "temp_roomodes.json"),
+            "--stdin-input",
             "data.security.deny"
-        ])
-        # Clean up temp file
-        (HERE / "temp_roomodes.json").unlink(missing_ok=True)
+        ], input=json.dumps({"roomodes": roomodes_data()}), text=True, check=True)
     else:
         print("! opa not found; skipping. Install from: https://www.openpolicyagent.org/docs/latest/#running-opa")
 
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+spectral_rules.py — native Python evaluation of the Spectral rules in `spectral.yaml`.
+Placement: project_root/.roo/mode-tools/spectral_rules.py
+
+Behavior:
+- Evaluates each rule's `given` JSONPath against the parsed `.roomodes` (no Node.js process).
+- Supports the JSONPath subset Spectral rulesets use here: `$`, `.key`, `['key']`, `[n]`,
+  `[*]` / `.*`, and recursive descent `..key` / `..*`.
+- Supports the core Spectral functions: pattern, schema, truthy, falsy, defined, undefined,
+  enumeration, length.
+- Findings carry the rule code, severity and the YAML line from the shared artifact.
+"""
+import re
+from pathlib import Path
+
+SEVERITIES = {"error": "error", "warn": "warning", "info": "info", "hint": "hint", 0: "error", 1: "warning", 2: "info", 3: "hint"}
+
+def load_ruleset(path: Path):
+    import yaml
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+
+_TOKEN = re.compile(r"""\.\.(?P<rname>[\w$-]+|\*)|\.(?P<name>[\w$-]+|\*)|\[\s*(?:(?P<index>-?\d+)|(?P<star>\*)|'(?P<sq>[^']*)'|"(?P<dq>[^"]*)")\s*\]""")
+
+def compile_path(expr: str):
+    """Tokenize a JSONPath into [(kind, arg)] with kind in child/recurse/index/wild."""
+    if not expr.startswith("$"):
+        raise ValueError(f"JSONPath must start with '$': {expr}")
+    steps, pos = [], 1
+    while pos < len(expr):
+        m = _TOKEN.match(expr, pos)
+        if not m:
+            raise ValueError(f"Unsupported JSONPath syntax at {expr[pos:]!r} in {expr}")
+        if m["rname"] is not None:
+            steps.append(("recurse", None if m["rname"] == "*" else m["rname"]))
+        elif m["name"] is not None:
+            steps.append(("wild", None) if m["name"] == "*" else ("child", m["name"]))
+        elif m["index"] is not None:
+            steps.append(("index", int(m["index"])))
+        elif m["star"] is not None:
+            steps.append(("wild", None))
+        else:
+            steps.append(("child", m["sq"] if m["sq"] is not None else m["dq"]))
+        pos = m.end()
+    return steps
+
+def _children(value, path):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield path + (k,), v
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield path + (i,), v
+
+def _descendants(value, path):
+    for child_path, child in _children(value, path):
+        yield child_path, child
+        yield from _descendants(child, child_path)
+
+def iter_path(data, steps):
+    """Yield (path tuple, value) for every node matched by compiled `steps`."""
+    nodes = [((), data)]
+    for kind, arg in steps:
+        out = []
+        for path, value in nodes:
+            if kind == "child":
+                if isinstance(value, dict) and arg in value:
+                    out.append((path + (arg,), value[arg]))
+            elif kind == "index":
+                if isinstance(value, list) and -len(value) <= arg < len(value):
+                    out.append((path + (arg % len(value),), value[arg]))
+            elif kind == "wild":
+                out.extend(_children(value, path))
+            elif kind == "recurse":
+                if arg is None:
+                    out.extend(_descendants(value, path))
+                else:
+                    for p, v in [(path, value), *_descendants(value, path)]:
+                        if isinstance(v, dict) and arg in v:
+                            out.append((p + (arg,), v[arg]))
+        nodes = out
+    return nodes
+
+def _fn_pattern(value, opts):
+    if not isinstance(value, str):
+        return []
+    errors = []
+    if "match" in opts and not re.search(opts["match"], value):
+        errors.append(f"must match the pattern '{opts['match']}'")
+    if "notMatch" in opts and re.search(opts["notMatch"], value):
+        errors.append(f"must not match the pattern '{opts['notMatch']}'")
+    return errors
+
+# id(schema) -> (schema, compiled validator); the schema is held so its id is never reused
+_SCHEMA_VALIDATORS = {}
+
+def _fn_schema(value, opts):
+    schema = opts.get("schema", {})
+    key = id(schema)
+    if key not in _SCHEMA_VALIDATORS:
+        from jsonschema import validators
+        _SCHEMA_VALIDATORS[key] = (schema, validators.validator_for(schema)(schema))
+    return [e.message for e in _SCHEMA_VALIDATORS[key][1].iter_errors(value)]
+
+def _fn_length(value, opts):
+    if isinstance(value, (str, list, dict)):
+        n = len(value)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        n = value
+    else:
+        return []
+    if "min" in opts and n < opts["min"]:
+        return [f"must be longer than {opts['min']}"]
+    if "max" in opts and n > opts["max"]:
+        return [f"must be shorter than {opts['max']}"]
+    return []
+
+FUNCTIONS = {
+    "pattern": _fn_pattern,
+    "schema": _fn_schema,
+    "truthy": lambda v, o: [] if v else ["must be truthy"],
+    "falsy": lambda v, o: ["must be falsy"] if v else [],
+    "defined": lambda v, o: ["must be defined"] if v is None else [],
+    "undefined": lambda v, o: [] if v is None else ["must be undefined"],
+    "enumeration": lambda v, o: [] if v in o.get("values", []) else [f"must be one of {o.get('values', [])}"],
+    "length": _fn_length,
+}
+
+def _render(template: str, rule, error, path):
+    return (template.replace("{{error}}", error)
+                    .replace("{{description}}", rule.get("description", ""))
+                    .replace("{{path}}", ".".join(map(str, path)) or "$")
+                    .replace("{{property}}", str(path[-1]) if path else "")
+                    .strip())
+
+def evaluate(ruleset, data, artifact=None):
+    """Yield finding dicts (level, message, rule, line, col, raw) for every rule violation."""
+    for code, rule in (ruleset.get("rules") or {}).items():
+        if not isinstance(rule, dict) or rule.get("enabled") is False or rule.get("severity") == "off":
+            continue
+        level = SEVERITIES.get(rule.get("severity", "warn"), "warning")
+        thens = rule.get("then") or []
+        thens = thens if isinstance(thens, list) else [thens]
+        givens = rule.get("given", "$")
+        givens = givens if isinstance(givens, list) else [givens]
+        for given in givens:
+            for path, value in iter_path(data, compile_path(given)):
+                for then in thens:
+                    fn = FUNCTIONS.get(then.get("function"))
+                    if fn is None:
+                        raise ValueError(f"Rule {code}: unsupported function {then.get('function')!r}")
+                    target_path, target = path, value
+                    if "field" in then:
+                        if not isinstance(value, dict):
+                            continue
+                        target_path, target = path + (then["field"],), value.get(then["field"])
+                    for error in fn(target, then.get("functionOptions") or {}):
+                        message = _render(rule.get("message", "{{description}} ({{error}})"), rule, error, target_path)
+                        yield {
+                            "level": level,
+                            "message": message,
+                            "rule": code,
+                            "line": artifact.line_for(target_path) if artifact else None,
+                            "col": None,
+                            "raw": f"{code}: {message} at {'.'.join(map(str, target_path)) or '$'}",
+                        }
@@ -1,17 +1,39 @@
 #!/usr/bin/env python3
 """
 summarize_mode_validation.py
-- Runs yamllint, spectral, and the schema validator against the project's `.roomodes`.
-- Emits a structured JSON + Markdown summary under `project_root/.roo/reports/`.
+- Runs yamllint (via its Python API), the spectral.yaml rules (native JSONPath engine, see
+  spectral_rules.py) and the schema validator in-process against the project's `.roomodes`,
+  all on the shared parse-once artifact — no subprocesses, no output scraping. The yamllint
+  CLI is used only when the yamllint package is not importable from this interpreter; its
+  output is streamed line by line into findings, only ~8k head/tail of stdout/stderr is kept
+  (10-idempotency-policy.md), and it is killed after its TOOL_TIMEOUTS entry.
+- Streams findings to JSONL as each tool produces them, then renders SARIF (for code-scanning
+  upload) and the Markdown summary from that stream, plus a compact JSON summary, into a
+  per-run directory `project_root/.roo/reports/runs/<run_id>/` that is published atomically
+  (report_runs.py), so concurrent runs never clobber each other. `reports/latest.json`, the
+  `reports/mode_validation_summary.{json,md}` copies and the handoff are replaced atomically
+  and `reports/runs/index.jsonl` lists every run.
+- Appends every run (summary, per-tool durations, findings) to the SQLite trend store
+  `project_root/.roo/reports/mode_validation_history.sqlite` (query with trend_store.py).
 - Writes a handoff payload under `project_root/.roo/handoff/` for consumption by Mode-Writer.
 
 Placement (recommended):
   project_root/.roo/mode-tools/summarize_mode_validation.py
 """
 
-import json, subprocess, shutil, sys, os, datetime
+import re, json, subprocess, shutil, sys, os, time, datetime, sqlite3, threading, codecs
+from bisect import bisect_right
+from collections import deque
 from pathlib import Path
 
+from report_stream import FindingStream, write_markdown, write_sarif
+from report_runs import RunOutput, prune_runs, safe_copy, safe_write_json, update_latest
+from trend_store import DB_NAME, record_run
+from roomodes_artifact import load_artifact
+from spectral_rules import evaluate, load_ruleset
+from validate_roomodes import (LazyValidator, VerdictCache, load_baseline, load_schema, schema_digest,
+                               validate_target)
+
 HERE = Path(__file__).resolve().parent
 
 def which(cmd):
@@ -24,19 +46,155 @@ def find_project_root(start: Path) -> Path | None:
             return p
     return None
 
-def run_cmd(args, input_text=None):
+# Per 10-idempotency-policy.md: keep stdoutHead/stderrHead to ~8k each, never whole logs
+HEAD_CHARS = 8192
+TAIL_CHARS = 8192
+# Pipes are read in fixed-size chunks; lines handed to callbacks are cut at HEAD_CHARS
+READ_BYTES = 65536
+# Seconds before an external tool is killed
+TOOL_TIMEOUTS = {"yamllint": 60}
+DEFAULT_TIMEOUT = 120
+
+class BoundedCapture:
+    """Keep the first HEAD_CHARS and last TAIL_CHARS of a stream; count (but drop) the middle."""
+
+    def __init__(self, head=HEAD_CHARS, tail=TAIL_CHARS):
+        self.head_limit, self.tail_limit = head, tail
+        self.head, self.tail = [], deque()
+        self.head_len = self.tail_len = self.total = self.dropped = 0
+
+    def add(self, text: str):
+        self.total += len(text)
+        if self.head_len < self.head_limit:
+            take = text[:self.head_limit - self.head_len]
+            self.head.append(take)
+            self.head_len += len(take)
+            text = text[len(take):]
+            if not text:
+                return
+        # Only the last tail_limit chars of an oversized piece can ever be kept
+        if len(text) > self.tail_limit:
+            self.dropped += len(text) - self.tail_limit
+            text = text[-self.tail_limit:]
+        self.tail.append(text)
+        self.tail_len += len(text)
+        while self.tail_len > self.tail_limit:
+            excess = self.tail_len - self.tail_limit
+            first = self.tail[0]
+            if len(first) <= excess:
+                self.tail.popleft()
+                cut = len(first)
+            else:
+                self.tail[0] = first[excess:]
+                cut = excess
+            self.tail_len -= cut
+            self.dropped += cut
+
+    def text(self) -> str:
+        gap = f"\n... [{self.dropped} chars omitted] ...\n" if self.dropped else ""
+        return "".join(self.head) + gap + "".join(self.tail)
+
+def run_cmd(args, input_text=None, on_line=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Run `args`, reading stdout/stderr in READ_BYTES chunks. Each stdout line is handed to `on_line`
+    as it arrives (cut at HEAD_CHARS); only bounded head/tail captures are kept. Returns (returncode, stdout, stderr, timed_out);
+    returncode is 124 when the tool was killed after `timeout` seconds.
+    """
     try:
-        cp = subprocess.run(
-            args,
-            input=input_text.encode("utf-8") if input_text else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False,
-            text=True
-        )
-        return cp.returncode, cp.stdout, cp.stderr
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     except FileNotFoundError as e:
-        return 127, "", str(e)
+        return 127, "", str(e), False
+
+    out, err = BoundedCapture(), BoundedCapture()
+
+    def pump(stream, capture, callback):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        with stream:
+            while True:
+                chunk = stream.read1(READ_BYTES)
+                text = decoder.decode(chunk, final=not chunk)
+                capture.add(text)
+                if callback is not None:
+                    lines = (pending + text).split("\n")
+                    # A partial line is held only up to HEAD_CHARS, however long it grows
+                    pending = lines.pop()[:HEAD_CHARS]
+                    for line in lines:
+                        callback(line[:HEAD_CHARS].rstrip("\r"))
+                if not chunk:
+                    break
+        if callback is not None and pending:
+            callback(pending.rstrip("\r"))
+
+    def feed():
+        try:
+            with proc.stdin:
+                proc.stdin.write(input_text.encode("utf-8"))
+        except (BrokenPipeError, OSError):
+            pass
+
+    threads = [threading.Thread(target=pump, args=(proc.stdout, out, on_line), daemon=True),
+               threading.Thread(target=pump, args=(proc.stderr, err, None), daemon=True)]
+    if input_text is not None:
+        threads.append(threading.Thread(target=feed, daemon=True))
+    for t in threads:
+        t.start()
+
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        proc.kill()
+        proc.wait()
+    for t in threads:
+        t.join()
+    if timed_out:
+        err.add(f"\n{Path(args[0]).name}: killed after {timeout}s timeout\n")
+    return (124 if timed_out else proc.returncode), out.text(), err.text(), timed_out
+
+# Fallback only (yamllint CLI installed outside this interpreter). Parsable lines: file:line:col: [level] message (rule)
+YAMLLINT_PARSABLE = re.compile(r"^.*:(?P<line>\d+):(?P<col>\d+): \[(?P<level>\w+)\] (?P<message>.*?)(?: \((?P<rule>[\w-]+)\))?$")
+
+def parse_yamllint_line(ln):
+    m = YAMLLINT_PARSABLE.match(ln)
+    if not m:
+        return {"level": "info", "message": ln, "raw": ln}
+    return {"level": m["level"], "message": m["message"], "rule": m["rule"],
+            "line": int(m["line"]), "col": int(m["col"]), "raw": ln}
+
+SCHEMA_MODE_PATH = re.compile(r"customModes/(\d+)")
+SCHEMA_LINE = re.compile(r"(?:\(line | at line )(\d+)")
+VALIDATOR_MODE_LINE = re.compile(r"^\s+([\w-]+): ")
+
+class ModeLocator:
+    """Attribute findings to the mode whose block contains them, using the artifact's line map."""
+
+    def __init__(self, artifact=None):
+        self.starts, self.slugs = [], []
+        modes = (artifact.data or {}).get("customModes") if artifact and isinstance(artifact.data, dict) else None
+        for i, mode in enumerate(modes or []):
+            line = artifact.lines.get(f"/customModes/{i}")
+            if isinstance(mode, dict) and line:
+                self.starts.append(line)
+                self.slugs.append(str(mode.get("slug")))
+        self._known = set(self.slugs)
+
+    def for_line(self, line):
+        if not line:
+            return None
+        i = bisect_right(self.starts, line) - 1
+        return self.slugs[i] if i >= 0 else None
+
+    def for_message(self, msg: str):
+        m = SCHEMA_MODE_PATH.search(msg)
+        if m and int(m.group(1)) < len(self.slugs):
+            return self.slugs[int(m.group(1))]
+        m = VALIDATOR_MODE_LINE.match(msg)
+        if m and m.group(1) in self._known:
+            return m.group(1)
+        return None
 
 def main():
     root = find_project_root(Path.cwd())
@@ -47,14 +205,23 @@ def main():
     reports_dir = root / ".roo" / "reports"
     handoff_dir = root / ".roo" / "handoff"
     reports_dir.mkdir(parents=True, exist_ok=True)
-    handoff_dir.mkdir(parents=True, exist_ok=True)
 
     target = root / ".roomodes"
     yamllint_cfg = HERE / "yamllint.yaml"
     spectral_cfg = HERE / "spectral.yaml"
-    validator = HERE / "validate_roomodes.py"
+
+    # Everything for this run is written to a private staging dir and published atomically
+    run = RunOutput(reports_dir)
+    json_path = run.path("mode_validation_summary.json")
+    md_path = run.path("mode_validation_summary.md")
+    jsonl_path = run.path("mode_validation_findings.jsonl")
+    sarif_path = run.path("mode_validation.sarif")
+
+    def rel(path):
+        return run.published(path.name).relative_to(root).as_posix()
 
     result = {
+        "run_id": run.run_id,
         "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
         "project_root": str(root),
         "target": str(target),
@@ -67,89 +234,111 @@ def main():
             "schema_valid": False,
         },
         "details": {
-            "yamllint": [],
-            "spectral": [],
+            "findings_jsonl": rel(jsonl_path),
+            "sarif": rel(sarif_path),
             "schema": {
                 "ok": False,
-                "errors": []
+                "error_count": 0
             }
         }
     }
 
-    # yamllint
-    yamllint = which("yamllint")
-    if yamllint:
-        code, out, err = run_cmd([yamllint, "-c", str(yamllint_cfg), "-f", "parsable", str(target)])
-        # parsable lines: file:line:col: level: message  (rule)
-        lines = [ln for ln in out.splitlines() if ln.strip()]
-        y_errs, y_warns = 0, 0
-        y_items = []
-        for ln in lines:
-            # Attempt to parse
-            # example: /path/.roomodes:12:5: [error] message  (rule-name)
-            level = "info"
-            message = ln
-            rule = None
+    # Parse `.roomodes` once; the in-process validator reuses the same cached artifact
+    cache_dir = root / ".roo" / ".cache"
+    try:
+        artifact = load_artifact(target, cache_dir)
+        raw = artifact.raw
+    except Exception:
+        artifact = None
+        with open(target, "r", encoding="utf-8", errors="replace") as f:
+            raw = f.read()
+    locate = ModeLocator(artifact)
+
+    # Findings are written to JSONL as each tool produces them; only counters stay in memory
+    with FindingStream(jsonl_path) as findings:
+        # yamllint (in-process, on the already-loaded text)
+        try:
+            from yamllint import linter
+            from yamllint.config import YamlLintConfig, YamlLintConfigError
+        except ImportError:
+            linter = None
+        if linter is not None:
+            start = time.perf_counter()
+            code = 0
+            try:
+                conf = YamlLintConfig(file=str(yamllint_cfg))
+                for p in linter.run(raw, conf, str(target)):
+                    findings.write("yamllint", p.level, p.desc, rule=p.rule, line=p.line, col=p.column,
+                                   raw=f"{target}:{p.line}:{p.column}: [{p.level}] {p.message}",
+                                   mode=locate.for_line(p.line))
+                    if p.level == "error":
+                        code = 1
+            except YamlLintConfigError as e:
+                findings.write("yamllint", "error", f"invalid config {yamllint_cfg.name}: {e}")
+                code = -1
+            result["tools"]["yamllint"] = {"available": True, "returncode": code, "mode": "api",
+                                           "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+            result["summary"]["yamllint_errors"] = findings.count("yamllint", "error")
+            result["summary"]["yamllint_warnings"] = findings.count("yamllint", "warning")
+        elif which("yamllint"):
+            start = time.perf_counter()
+
+            def on_line(ln):
+                if ln.strip():
+                    item = parse_yamllint_line(ln)
+                    findings.write("yamllint", mode=locate.for_line(item.get("line")), **item)
+
+            code, out, err, timed_out = run_cmd([which("yamllint"), "-c", str(yamllint_cfg), "-f", "parsable", str(target)],
+                                                on_line=on_line, timeout=TOOL_TIMEOUTS["yamllint"])
+            result["tools"]["yamllint"] = {"available": True, "returncode": code, "mode": "cli", "timed_out": timed_out,
+                                           "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+            if err.strip():
+                result["tools"]["yamllint"]["stderrHead"] = err
+            result["summary"]["yamllint_errors"] = findings.count("yamllint", "error")
+            result["summary"]["yamllint_warnings"] = findings.count("yamllint", "warning")
+        else:
+            result["tools"]["yamllint"] = {"available": False}
+
+        # spectral (native JSONPath rule engine over the shared artifact)
+        start = time.perf_counter()
+        code = 0
+        if artifact is None:
+            findings.write("spectral", "error", "Skipped: `.roomodes` could not be parsed.")
+            code = -1
+        else:
             try:
-                head, rest = ln.split(":", 3)[0:3], ln.split(":", 3)[3]
-            except Exception:
-                head, rest = None, None
-
-            # Split by " [level] " pattern if present
-            if " [error] " in ln:
-                level = "error"
-            elif " [warning] " in ln:
-                level = "warning"
-            elif " [info] " in ln:
-                level = "info"
-
-            if "  (" in ln and ln.endswith(")"):
-                try:
-                    msg, rulep = ln.rsplit("  (", 1)
-                    rule = rulep[:-1]
-                    message = msg.split("]: ", 1)[-1]
-                except Exception:
-                    message = ln
-
-            if level == "error":
-                y_errs += 1
-            elif level == "warning":
-                y_warns += 1
-
-            y_items.append({"level": level, "message": message, "raw": ln, "rule": rule})
-
-        result["tools"]["yamllint"] = {"available": True, "returncode": code}
-        result["summary"]["yamllint_errors"] = y_errs
-        result["summary"]["yamllint_warnings"] = y_warns
-        result["details"]["yamllint"] = y_items
-    else:
-        result["tools"]["yamllint"] = {"available": False}
+                for item in evaluate(load_ruleset(spectral_cfg), artifact.data, artifact):
+                    findings.write("spectral", mode=locate.for_line(item["line"]), **item)
+                    if item["level"] == "error":
+                        code = 1
+            except (OSError, ValueError) as e:
+                findings.write("spectral", "error", f"invalid ruleset {spectral_cfg.name}: {e}")
+                code = -1
+        result["tools"]["spectral"] = {"available": True, "returncode": code, "mode": "native",
+                                       "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+        result["summary"]["spectral_issues"] = findings.count("spectral")
 
-    # spectral
-    spectral = which("spectral")
-    if spectral:
-        code, out, err = run_cmd([spectral, "lint", "-r", str(spectral_cfg), str(target), "-f", "json"])
-        issues = []
+        # schema validator (in-process, on the shared artifact)
+        start = time.perf_counter()
         try:
-            issues = json.loads(out)
-        except Exception:
-            # fallback: treat as text
-            issues = [{"raw": ln} for ln in out.splitlines() if ln.strip()]
-        result["tools"]["spectral"] = {"available": True, "returncode": code}
-        result["summary"]["spectral_issues"] = len(issues)
-        result["details"]["spectral"] = issues
-    else:
-        result["tools"]["spectral"] = {"available": False}
-
-    # schema validator
-    code, out, err = run_cmd([sys.executable, str(validator), str(target)])
-    schema_ok = code == 0
-    result["details"]["schema"]["ok"] = schema_ok
-    if not schema_ok:
-        msgs = (out + "\n" + err).strip().splitlines()
-        # Collect schema errors (stderr contains "Schema error at ...")
-        result["details"]["schema"]["errors"] = [m for m in msgs if m.strip()]
-    result["summary"]["schema_valid"] = schema_ok
+            verdicts = VerdictCache(cache_dir / "schema_verdicts.json", schema_digest(HERE))
+            check = validate_target(target, LazyValidator(load_schema(HERE)), load_baseline(HERE), HERE,
+                                    verdicts=verdicts, cache_dir=cache_dir)
+        except Exception as e:
+            check = {"ok": False, "errors": [f"Error: {type(e).__name__}: {e}"]}
+        schema_ok = check["ok"]
+        result["tools"]["schema"] = {"available": True, "returncode": 0 if schema_ok else 1,
+                                     "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+        result["details"]["schema"]["ok"] = schema_ok
+        if not schema_ok:
+            # Collect schema errors ("Schema error at ... (line N): ...")
+            for m in check["errors"]:
+                if m.strip():
+                    line = SCHEMA_LINE.search(m)
+                    findings.write("schema", "error", m, line=int(line.group(1)) if line else None,
+                                   mode=locate.for_message(m))
+        result["details"]["schema"]["error_count"] = findings.count("schema")
+        result["summary"]["schema_valid"] = schema_ok
 
     # Overall status
     if result["summary"]["schema_valid"] and result["summary"]["yamllint_errors"] == 0 and result["summary"]["spectral_issues"] == 0:
@@ -157,68 +346,63 @@ def main():
     else:
         result["summary"]["status"] = "fail"
 
-    # Write JSON + Markdown
-    json_path = reports_dir / "mode_validation_summary.json"
-    md_path = reports_dir / "mode_validation_summary.md"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-
-    def md_escape(s): return s.replace("<", "\\<").replace(">", "\\>")
-
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(f"# Mode Validation Summary\n\n")
-        f.write(f"- **Timestamp (UTC):** {result['timestamp']}\n")
-        f.write(f"- **Target:** `{md_escape(str(target))}`\n")
-        f.write(f"- **Status:** **{result['summary']['status'].upper()}**\n")
-        f.write(f"- **Schema valid:** {result['summary']['schema_valid']}\n")
-        if 'yamllint_errors' in result['summary']:
-            f.write(f"- **yamllint:** {result['summary'].get('yamllint_errors',0)} errors, {result['summary'].get('yamllint_warnings',0)} warnings\n")
-        if 'spectral_issues' in result['summary']:
-            f.write(f"- **spectral issues:** {result['summary'].get('spectral_issues',0)}\n")
-        f.write("\n---\n\n")
-        if result["details"]["schema"]["errors"]:
-            f.write("## Schema Errors\n\n")
-            for e in result["details"]["schema"]["errors"]:
-                f.write(f"- {md_escape(e)}\n")
-            f.write("\n")
-        if result["details"]["yamllint"]:
-            f.write("## yamllint Findings\n\n")
-            for item in result["details"]["yamllint"][:100]:
-                level = item.get("level","info")
-                msg = item.get("message","").strip()
-                rule = item.get("rule","")
-                rule_s = f" *(rule: {rule})*" if rule else ""
-                f.write(f"- **{level}** — {md_escape(msg)}{rule_s}\n")
-            if len(result["details"]["yamllint"]) > 100:
-                f.write(f"\n(+{len(result['details']['yamllint'])-100} more)\n\n")
-        if result["details"]["spectral"]:
-            f.write("\n## Spectral Findings\n\n")
-            for issue in result["details"]["spectral"][:100]:
-                if isinstance(issue, dict):
-                    msg = issue.get("message") or issue.get("raw") or str(issue)
-                else:
-                    msg = str(issue)
-                f.write(f"- {md_escape(msg)}\n")
-            if len(result["details"]["spectral"]) > 100:
-                f.write(f"\n(+{len(result['details']['spectral'])-100} more)\n\n")
-
-    # Handoff payload for Mode-Writer
-    handoff = {
-        "receiver_slug": "mode-writer",
-        "handoff_type": "mode_validation_result",
-        "summary_json": str(json_path.relative_to(root)),
-        "summary_md": str(md_path.relative_to(root)),
-        "status": result["summary"]["status"],
-        "timestamp": result["timestamp"]
-    }
+    # Write JSON + SARIF + Markdown (the latter two rendered from the JSONL stream)
+    try:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        write_sarif(jsonl_path, sarif_path, target.relative_to(root).as_posix())
+        write_markdown(jsonl_path, md_path, result)
+
+        # Handoff payload for Mode-Writer; it points into this run's directory so it stays
+        # consistent even when another run publishes in between
+        handoff = {
+            "receiver_slug": "mode-writer",
+            "handoff_type": "mode_validation_result",
+            "run_id": run.run_id,
+            "summary_json": rel(json_path),
+            "summary_md": rel(md_path),
+            "findings_jsonl": rel(jsonl_path),
+            "sarif": rel(sarif_path),
+            "status": result["summary"]["status"],
+            "timestamp": result["timestamp"]
+        }
+        with open(run.path("mode_validation_handoff.json"), "w", encoding="utf-8") as f:
+            json.dump(handoff, f, indent=2, ensure_ascii=False)
+        run.publish({"status": result["summary"]["status"], "timestamp": result["timestamp"]})
+    except BaseException:
+        run.discard()
+        raise
+
+    # Shared "latest" views: each file is replaced atomically, never truncated in place, and only
+    # by the newest run, so a slow earlier run cannot roll them back
     handoff_path = handoff_dir / "mode_validation_handoff.json"
-    with open(handoff_path, "w", encoding="utf-8") as f:
-        json.dump(handoff, f, indent=2, ensure_ascii=False)
+
+    def publish_shared():
+        safe_write_json(handoff_path, handoff)
+        safe_copy(run.published(json_path.name), reports_dir / json_path.name)
+        safe_copy(run.published(md_path.name), reports_dir / md_path.name)
+
+    if not update_latest(reports_dir, {"run_id": run.run_id, "dir": run.final.relative_to(root).as_posix(),
+                                       "status": result["summary"]["status"], "timestamp": result["timestamp"]},
+                         on_latest=publish_shared):
+        # Superseded: this run's own copy is still the consistent handoff for it
+        handoff_path = run.published("mode_validation_handoff.json")
+
+    # Append to the local trend history; never fail the summary over it
+    try:
+        record_run(reports_dir / DB_NAME, result, run.published(jsonl_path.name))
+    except sqlite3.Error as e:
+        print(f"WARNING: Could not record run history: {e}", file=sys.stderr)
+    prune_runs(reports_dir)
 
     print(json.dumps({
         "ok": True,
-        "summary_json": str(json_path),
-        "summary_md": str(md_path),
+        "run_id": run.run_id,
+        "run_dir": str(run.final),
+        "summary_json": str(run.published(json_path.name)),
+        "summary_md": str(run.published(md_path.name)),
+        "findings_jsonl": str(run.published(jsonl_path.name)),
+        "sarif": str(run.published(sarif_path.name)),
         "handoff": str(handoff_path),
         "status": result["summary"]["status"]
     }))
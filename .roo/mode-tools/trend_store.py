@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+trend_store.py — append-only SQLite history of mode validation runs, plus a trend query CLI.
+Placement: project_root/.roo/mode-tools/trend_store.py
+
+Behavior:
+- `record_run` appends one run (summary, per-tool durations, every finding) to
+  `project_root/.roo/reports/mode_validation_history.sqlite`. Findings are streamed from the
+  run's JSONL file, never loaded as a whole.
+- Indexed on timestamp, mode and rule so trend queries stay fast across thousands of runs.
+
+Usage:
+  python trend_store.py findings [--days 30] [--by tool|mode|rule|level]
+  python trend_store.py slowest [--limit 10]
+  python trend_store.py regressions
+  (add --db PATH to query a specific database; default: auto-discovered project root)
+"""
+import sys, sqlite3, argparse
+from pathlib import Path
+
+from report_stream import iter_findings
+
+DB_NAME = "mode_validation_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    project_root TEXT,
+    target TEXT,
+    status TEXT,
+    yamllint_errors INTEGER,
+    yamllint_warnings INTEGER,
+    spectral_issues INTEGER,
+    schema_valid INTEGER
+);
+CREATE TABLE IF NOT EXISTS tool_runs (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    tool TEXT NOT NULL,
+    available INTEGER,
+    returncode INTEGER,
+    duration_ms REAL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    ts TEXT NOT NULL,
+    tool TEXT,
+    level TEXT,
+    rule TEXT,
+    mode TEXT,
+    line INTEGER,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs(ts);
+CREATE INDEX IF NOT EXISTS idx_runs_target ON runs(project_root, target, ts);
+CREATE INDEX IF NOT EXISTS idx_tool_runs_tool ON tool_runs(tool, duration_ms);
+CREATE INDEX IF NOT EXISTS idx_findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_ts ON findings(ts);
+CREATE INDEX IF NOT EXISTS idx_findings_mode ON findings(mode, run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_rule ON findings(rule, ts);
+"""
+
+def find_project_root(start: Path) -> Path | None:
+    cur = start.resolve()
+    for p in [cur, *cur.parents]:
+        if (p / ".roomodes").exists():
+            return p
+    return None
+
+def connect(db_path: Path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    # WAL lets trend queries read while a validation run appends
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def record_run(db_path: Path, result, findings_jsonl: Path):
+    """Append one summarize_mode_validation result and its findings; returns the run id."""
+    summary = result["summary"]
+    ts = result["timestamp"]
+    conn = connect(db_path)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (ts, project_root, target, status, yamllint_errors, yamllint_warnings,"
+                " spectral_issues, schema_valid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ts, result["project_root"], result["target"], summary["status"], summary["yamllint_errors"],
+                 summary["yamllint_warnings"], summary["spectral_issues"], int(summary["schema_valid"])))
+            run_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO tool_runs (run_id, tool, available, returncode, duration_ms) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, tool, int(info.get("available", True)), info.get("returncode"), info.get("duration_ms"))
+                 for tool, info in result["tools"].items()])
+            conn.executemany(
+                "INSERT INTO findings (run_id, ts, tool, level, rule, mode, line, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, ts, f["tool"], f["level"], f.get("rule"), f.get("mode"), f.get("line"), f["message"])
+                 for f in iter_findings(findings_jsonl)))
+        return run_id
+    finally:
+        conn.close()
+
+def query_findings(conn, days: int, by: str):
+    """Findings per day over the last `days` days, grouped by tool/mode/rule/level."""
+    if by not in ("tool", "mode", "rule", "level"):
+        raise ValueError(f"Unsupported grouping: {by}")
+    return conn.execute(
+        f"SELECT substr(ts, 1, 10) AS day, COALESCE({by}, '(none)') AS key, COUNT(*) AS findings,"
+        f" COUNT(DISTINCT run_id) AS runs"
+        f" FROM findings WHERE ts >= strftime('%Y-%m-%dT%H:%M:%S', 'now', ?)"
+        f" GROUP BY day, key ORDER BY day, findings DESC",
+        (f"-{days} days",)).fetchall()
+
+def query_slowest(conn, limit: int):
+    """Tools ranked by mean duration, with max and run counts."""
+    return conn.execute(
+        "SELECT tool, COUNT(*) AS runs, ROUND(AVG(duration_ms), 2) AS avg_ms, ROUND(MAX(duration_ms), 2) AS max_ms"
+        " FROM tool_runs WHERE duration_ms IS NOT NULL"
+        " GROUP BY tool ORDER BY avg_ms DESC LIMIT ?", (limit,)).fetchall()
+
+def query_regressions(conn):
+    """Modes whose finding count rose between the two most recent runs of the same target.
+
+    Runs are paired per (project_root, target), so concurrent runs against other targets
+    never stand in for "previous".
+    """
+    return conn.execute(
+        "WITH ranked AS ("
+        "  SELECT id, project_root, target,"
+        "         ROW_NUMBER() OVER (PARTITION BY project_root, target ORDER BY ts DESC, id DESC) AS rn"
+        "  FROM runs),"
+        " pairs AS ("
+        "  SELECT a.target, a.id AS latest_id, b.id AS previous_id FROM ranked a JOIN ranked b"
+        "  ON a.project_root IS b.project_root AND a.target IS b.target AND a.rn = 1 AND b.rn = 2)"
+        " SELECT p.target, f.mode, SUM(f.run_id = p.latest_id) AS latest, SUM(f.run_id = p.previous_id) AS previous"
+        " FROM pairs p JOIN findings f ON f.run_id IN (p.latest_id, p.previous_id)"
+        " WHERE f.mode IS NOT NULL"
+        " GROUP BY p.target, f.mode HAVING latest > previous ORDER BY latest - previous DESC, p.target, f.mode"
+    ).fetchall()
+
+def print_rows(headers, rows):
+    print("\t".join(headers))
+    for row in rows:
+        print("\t".join("" if v is None else str(v) for v in row))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query mode validation history")
+    parser.add_argument("--db", help=f"Path to {DB_NAME} (default: <project_root>/.roo/reports/{DB_NAME})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_findings = sub.add_parser("findings", help="Findings over time")
+    p_findings.add_argument("--days", type=int, default=30)
+    p_findings.add_argument("--by", default="tool", choices=["tool", "mode", "rule", "level"])
+    p_slowest = sub.add_parser("slowest", help="Slowest tools by mean duration")
+    p_slowest.add_argument("--limit", type=int, default=10)
+    sub.add_parser("regressions", help="Modes with more findings than in the previous run of the same target")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        root = find_project_root(Path.cwd())
+        if root is None:
+            print("ERROR: Could not locate project root containing `.roomodes` from current path.", file=sys.stderr)
+            sys.exit(1)
+        db_path = root / ".roo" / "reports" / DB_NAME
+    if not db_path.exists():
+        print(f"ERROR: No history database at `{db_path}`; run summarize_mode_validation.py first.", file=sys.stderr)
+        sys.exit(1)
+
+    conn = connect(db_path)
+    try:
+        if args.command == "findings":
+            print_rows(["day", args.by, "findings", "runs"], query_findings(conn, args.days, args.by))
+        elif args.command == "slowest":
+            print_rows(["tool", "runs", "avg_ms", "max_ms"], query_slowest(conn, args.limit))
+        elif args.command == "regressions":
+            print_rows(["target", "mode", "latest", "previous"], query_regressions(conn))
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
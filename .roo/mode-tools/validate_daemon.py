@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+validate_daemon.py — long-lived validation server for editor integrations and git hooks.
+Placement: project_root/.roo/mode-tools/validate_daemon.py
+
+Behavior:
+- `serve` keeps the compiled schema, baseline, content policy, `.roo/` rules index and parsed
+  `.roomodes` artifacts in memory and answers JSON-RPC 2.0 requests (one JSON object per line)
+  on a local Unix socket.
+- State is invalidated by mtime: config files, the rules tree and each target are re-stat'ed on
+  every request and reloaded only when they changed.
+- `check` is the thin client: same output and exit codes as validate_roomodes.py. It imports
+  nothing heavy and falls back to an in-process validation when no daemon is listening.
+
+Methods: validate {"target": path} · ping · stats · shutdown
+
+Usage:
+  python validate_daemon.py serve [--socket PATH]
+  python validate_daemon.py check [--socket PATH] [optional_path_to_roomodes]
+  python validate_daemon.py stop  [--socket PATH]
+  python validate_daemon.py stats [--socket PATH]
+"""
+import os, sys, json, socket, hashlib, argparse
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+# AF_UNIX paths are limited to ~104-108 bytes
+MAX_SOCKET_PATH = 100
+
+def default_socket_path(script_dir: Path = HERE) -> Path:
+    path = script_dir.parent / ".cache" / "validate.sock"
+    if len(str(path)) > MAX_SOCKET_PATH:
+        tag = hashlib.sha256(str(script_dir).encode("utf-8")).hexdigest()[:8]
+        path = Path("/tmp") / f"roomodes-validate-{tag}.sock"
+    return path
+
+def find_project_root(start: Path) -> Path | None:
+    cur = start.resolve()
+    for p in [cur, *cur.parents]:
+        if (p / ".roomodes").exists():
+            return p
+    return None
+
+class ValidatorState:
+    """Everything validate_target needs, reloaded only when the files behind it change."""
+
+    CONFIG_FILES = ("roomodes.schema.json", "security_baseline.json", "content_policy.json")
+
+    def __init__(self, script_dir: Path):
+        import validate_roomodes
+        from content_policy import load_policy
+        from rules_index import RulesIndex
+        self._vr = validate_roomodes
+        self._load_policy = load_policy
+        self._RulesIndex = RulesIndex
+        self.script_dir = script_dir
+        self.cache_dir = script_dir.parent / ".cache"
+        self._config_sig = None
+        self.index = None
+        self._artifacts = {}
+        self.stats = {"requests": 0, "config_reloads": 0, "index_rebuilds": 0, "artifact_loads": 0}
+
+    def _stat_sig(self, path: Path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def refresh(self):
+        sig = tuple(self._stat_sig(self.script_dir / name) for name in self.CONFIG_FILES)
+        if sig != self._config_sig:
+            vr = self._vr
+            self.validator = vr.LazyValidator(vr.load_schema(self.script_dir))
+            self.baseline = vr.load_baseline(self.script_dir)
+            self.policy = self._load_policy(self.script_dir)
+            self.verdicts = vr.VerdictCache(self.cache_dir / "schema_verdicts.json", vr.schema_digest(self.script_dir))
+            self._config_sig = sig
+            self.stats["config_reloads"] += 1
+        if self.index is None or self.index.is_stale():
+            self.index = self._RulesIndex(self.script_dir.parent)
+            self.stats["index_rebuilds"] += 1
+
+    def artifact(self, target: Path):
+        from roomodes_artifact import load_artifact
+        sig = self._stat_sig(target)
+        cached = self._artifacts.get(target)
+        if cached is None or cached[0] != sig:
+            cached = (sig, load_artifact(target, self.cache_dir))
+            self._artifacts[target] = cached
+            self.stats["artifact_loads"] += 1
+        return cached[1]
+
+    def validate(self, target: Path):
+        from roomodes_artifact import ArtifactError
+        self.refresh()
+        try:
+            try:
+                artifact = self.artifact(target)
+            except ArtifactError:
+                # Let validate_target report it (tab/indent findings take precedence)
+                artifact = None
+            result = self._vr.validate_target(target, self.validator, self.baseline, self.script_dir, self.index,
+                                              self.policy, self.verdicts, self.cache_dir, artifact)
+        except Exception as e:
+            result = {"target": str(target), "ok": False, "errors": [f"Error: {type(e).__name__}: {e}"], "warnings": []}
+        code, out, err = self._vr.render_result(result, target)
+        return {"exit_code": code, "stdout": out, "stderr": err, "result": result}
+
+def serve(sock_path: Path, script_dir: Path = HERE):
+    import socketserver
+    state = ValidatorState(script_dir)
+    state.refresh()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                reply = self.dispatch(line)
+                self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+        def dispatch(self, line: bytes):
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                return {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {e}"}}
+            rid, method, params = req.get("id"), req.get("method"), req.get("params") or {}
+            state.stats["requests"] += 1
+            if method == "validate":
+                target = Path(params.get("target", "")).resolve()
+                if target.is_dir():
+                    target = target / ".roomodes"
+                if not target.exists():
+                    return {"jsonrpc": "2.0", "id": rid, "result": {
+                        "exit_code": 1, "stdout": [], "stderr": [f"Error: `{target}` does not exist."]}}
+                return {"jsonrpc": "2.0", "id": rid, "result": state.validate(target)}
+            if method == "ping":
+                return {"jsonrpc": "2.0", "id": rid, "result": "pong"}
+            if method == "stats":
+                return {"jsonrpc": "2.0", "id": rid, "result": state.stats}
+            if method == "shutdown":
+                server.shutting_down = True
+                return {"jsonrpc": "2.0", "id": rid, "result": "bye"}
+            return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32601, "message": f"Method not found: {method}"}}
+
+    sock_path.parent.mkdir(parents=True, exist_ok=True)
+    if sock_path.exists():
+        if call(sock_path, "ping") is not None:
+            print(f"Error: A daemon is already listening on `{sock_path}`.", file=sys.stderr)
+            sys.exit(1)
+        sock_path.unlink()
+
+    server = socketserver.UnixStreamServer(str(sock_path), Handler)
+    server.shutting_down = False
+    os.chmod(sock_path, 0o600)
+    print(f"Listening on {sock_path}", flush=True)
+    try:
+        while not server.shutting_down:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sock_path.unlink(missing_ok=True)
+
+def call(sock_path: Path, method: str, params=None, timeout: float = 30.0):
+    """One JSON-RPC round trip; None when no daemon is listening."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(str(sock_path))
+            s.sendall((json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}) + "\n").encode("utf-8"))
+            buf = b""
+            while not buf.endswith(b"\n"):
+                chunk = s.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+    except OSError:
+        return None
+    reply = json.loads(buf) if buf else {}
+    if "error" in reply:
+        raise SystemExit(f"Error: daemon: {reply['error']['message']}")
+    return reply.get("result")
+
+def check(sock_path: Path, target_arg: str | None):
+    if target_arg:
+        target = Path(target_arg).resolve()
+    else:
+        root = find_project_root(Path.cwd())
+        if root is None:
+            print("Error: Could not find project root containing `.roomodes` by walking upward from CWD.", file=sys.stderr)
+            sys.exit(1)
+        target = root / ".roomodes"
+
+    reply = call(sock_path, "validate", {"target": str(target)})
+    if reply is None:
+        # No daemon: validate in-process with identical output
+        import validate_roomodes
+        validate_roomodes.main(["validate_roomodes.py", str(target)])
+        return
+    for line in reply["stderr"]:
+        print(line, file=sys.stderr)
+    for line in reply["stdout"]:
+        print(line)
+    sys.exit(reply["exit_code"])
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--socket", help="Unix socket path (default: <project_root>/.roo/.cache/validate.sock)")
+    parser = argparse.ArgumentParser(description="Long-lived `.roomodes` validation daemon and thin client")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", parents=[common], help="Run the daemon in the foreground")
+    p_check = sub.add_parser("check", parents=[common], help="Validate through the daemon (in-process fallback)")
+    p_check.add_argument("target", nargs="?", help="Path to `.roomodes` or its directory")
+    sub.add_parser("stop", parents=[common], help="Shut the daemon down")
+    sub.add_parser("stats", parents=[common], help="Print daemon cache statistics")
+    args = parser.parse_args(argv)
+
+    sock_path = Path(args.socket) if args.socket else default_socket_path()
+
+    if args.command == "serve":
+        serve(sock_path)
+    elif args.command == "check":
+        check(sock_path, args.target)
+    else:
+        reply = call(sock_path, "shutdown" if args.command == "stop" else "stats")
+        if reply is None:
+            print(f"Error: No daemon listening on `{sock_path}`.", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(reply))
+
+if __name__ == "__main__":
+    main()
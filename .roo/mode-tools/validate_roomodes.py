@@ -7,14 +7,39 @@ Behavior:
 - If a file path is provided, validate that file.
 - If no path is provided, walk upward from CWD to find the *project root* that contains `.roomodes` and validate it.
 - Enforces: (1) no tabs anywhere, (2) indentation is a multiple of configured spaces, (3) JSON Schema validity, (4) security patterns, (5) structural requirements.
+
+Fast start (for hook paths):
+- `yaml` and `jsonschema` are imported only when first needed; YAML is parsed with libyaml's
+  `CSafeLoader` when PyYAML was built with it.
+- With `--cache` (opt-in; the validator is otherwise read-only), a passing schema verdict and the
+  parsed artifact are cached under the target project's `.roo/.cache/`, keyed by the content hash
+  of the target and the schema; when the verdict applies, jsonschema is never imported.
+- `bench_startup.py` measures import/parse/run time against a budget.
 """
-import sys, re, json, yaml
+import sys, re, json, hashlib, os
+from fnmatch import fnmatch
 from pathlib import Path
-from jsonschema import Draft202012Validator
+from rules_index import RulesIndex
+from roomodes_artifact import ArtifactError, load_artifact
+from content_policy import (BLOCKING_SEVERITIES, build_matcher, check_text, format_issue,
+                            load_policy, policies_for, shift_lines, validate_rules_content)
 
 # Indentation size for the reference file (auto-detected when the pack was generated)
 INDENT = 2
 
+# Per-mode rules directory, relative to `.roo/`. This is the validator's baseline layout
+# (`.roo/rules/rules-<slug>/`), kept as-is; Roo Code itself also loads `.roo/rules-<slug>/`.
+MODE_RULES_DIR = "rules/rules-{slug}"
+
+# `key: |-` / `key: >` — a block scalar's text starts on the line below its indicator
+BLOCK_SCALAR_HEADER = re.compile(r"[|>][-+0-9]*\s*(?:#.*)?$")
+
+# Compiled once at import so repeated validations (batch runs) do not recompile them
+INEFFECTIVE_PATTERNS = [
+    (re.compile(r'(?!.*\w+)'), 'Negative lookahead - use positive allowlist'),
+    (re.compile(r'\.\*(?!\)|\$)'), 'Unanchored wildcard - add ^ and $'),
+]
+
 def find_project_root(start: Path) -> Path | None:
     cur = start.resolve()
     for p in [cur, *cur.parents]:
@@ -27,6 +52,56 @@ def load_schema(script_dir: Path):
     with open(schema_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def schema_digest(script_dir: Path) -> str:
+    with open(script_dir / "roomodes.schema.json", "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class LazyValidator:
+    """Draft 2020-12 validator that imports jsonschema and compiles the schema on first use."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._validator = None
+
+    def iter_errors(self, data):
+        if self._validator is None:
+            from jsonschema import Draft202012Validator
+            self._validator = Draft202012Validator(self.schema)
+        return self._validator.iter_errors(data)
+
+class VerdictCache:
+    """Content hashes of `.roomodes` files that passed schema validation against one schema version."""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self, path: Path, schema_hash: str):
+        self.path = path
+        self.schema_hash = schema_hash
+        self.valid = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("schema") == schema_hash:
+                self.valid = list(cached.get("valid", []))
+        except (OSError, ValueError):
+            pass
+
+    def is_valid(self, digest: str) -> bool:
+        return digest in self.valid
+
+    def record(self, digest: str):
+        if digest in self.valid:
+            return
+        self.valid = (self.valid + [digest])[-self.MAX_ENTRIES:]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"schema": self.schema_hash, "valid": self.valid}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
 def read_text(path: Path) -> str:
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
@@ -72,26 +147,24 @@ def validate_mode_structure(mode_config):
 
     return errors, warnings
 
-def validate_memory_file_naming(script_dir: Path):
+def validate_memory_file_naming(script_dir: Path, index: RulesIndex | None = None):
     """Validate memory file naming convention across all mode directories"""
     errors = []
 
-    roo_dir = script_dir.parent
-    rules_dir = roo_dir / "rules"
+    if index is None:
+        index = RulesIndex(script_dir.parent)
 
-    if not rules_dir.exists():
+    if not index.has_dir("rules"):
         return errors, []
 
     # Find all mode directories (rules-* pattern)
-    mode_dirs = [d for d in rules_dir.iterdir() if d.is_dir() and d.name.startswith("rules-")]
+    mode_names = [d for d in index.subdirs("rules") if d.startswith("rules-")]
 
-    for mode_dir in mode_dirs:
-        mode_name = mode_dir.name
-        memory_files = []
+    for mode_name in mode_names:
+        mode_rel = f"rules/{mode_name}"
 
         # Find all files starting with "40-memory-"
-        for file_path in mode_dir.glob("40-memory-*.md"):
-            memory_files.append(file_path.name)
+        memory_files = index.glob(mode_rel, "40-memory-*.md")
 
         # Check for violations
         if len(memory_files) != 1:
@@ -117,7 +190,7 @@ def validate_memory_file_naming(script_dir: Path):
         # Check for forbidden naming patterns
         forbidden_names = ["40-memory-integration.md", "40-memory-reads.md"]
         for forbidden in forbidden_names:
-            if (mode_dir / forbidden).exists():
+            if index.exists(mode_rel, forbidden):
                 errors.append({
                     'mode': mode_name,
                     'issue': f'Forbidden memory file name: {forbidden} - must use 40-memory-io.md',
@@ -126,52 +199,66 @@ def validate_memory_file_naming(script_dir: Path):
 
     return errors, []
 
-def validate_memory_protocol_compliance(mode_config, script_dir: Path):
-    """Validate that all modes have proper memory protocol integration"""
+def text_start_line(artifact, raw_lines, parts):
+    """`.roomodes` line holding the first line of the string at `parts` (None without an artifact)."""
+    if artifact is None:
+        return None
+    line = artifact.line_for(parts)
+    if line is None:
+        return None
+    if line <= len(raw_lines) and BLOCK_SCALAR_HEADER.search(raw_lines[line - 1]):
+        line += 1
+    return line
+
+def validate_memory_protocol_compliance(mode_config, script_dir: Path, index: RulesIndex | None = None, policy=None,
+                                        artifact=None):
+    """Validate that all modes have proper memory protocol integration
+
+    With the `.roomodes` artifact, customInstructions hit lines are reported as file lines.
+    """
     errors = []
     warnings = []
 
     roo_dir = script_dir.parent
-    rules_dir = roo_dir / "rules"
-
-    for mode in mode_config['customModes']:
+    if index is None:
+        index = RulesIndex(roo_dir)
+    if policy is None:
+        policy = load_policy(script_dir)
+
+    ci_policies = policies_for(policy, "customInstructions")
+    ci_matcher = build_matcher(ci_policies)
+    mode_policies = policies_for(policy, "modeRules")
+    by_id = {p['id']: p for p in ci_policies + mode_policies}
+    raw_lines = artifact.raw.splitlines() if artifact is not None else []
+
+    for i, mode in enumerate(mode_config['customModes']):
         slug = mode['slug']
         custom_instructions = mode.get('customInstructions', '')
-
-        # Check for mandatory memory protocol structure
-        required_phrases = [
-            'MANDATORY MEMORY PROTOCOL',
-            'PRE-FLIGHT:',
-            'POST-FLIGHT:',
-            'memory:search_nodes',
-            'Write: Observation envelope',
-            'Link: Relations',
-            'Confirm: List entity IDs'
-        ]
-
-        missing_phrases = []
-        for phrase in required_phrases:
-            if phrase not in custom_instructions:
-                missing_phrases.append(phrase)
-
-        if missing_phrases:
-            errors.append({
+        first_line = text_start_line(artifact, raw_lines, ["customModes", i, "customInstructions"]) \
+            if 'customInstructions' in mode else None
+
+        # Check customInstructions against every customInstructions-scope policy in one scan
+        for finding in check_text(custom_instructions, ci_policies, ci_matcher):
+            if first_line is not None:
+                shift_lines(finding, first_line)
+            entry = {
                 'mode': slug,
-                'issue': f'Missing memory protocol elements: {", ".join(missing_phrases)}',
-                'severity': 'CRITICAL',
-                'description': 'Mode must have complete memory protocol checkpoints in customInstructions'
-            })
+                'issue': format_issue(by_id[finding['policy']], finding),
+                'severity': finding['severity'],
+                'description': finding['description']
+            }
+            (errors if finding['severity'] in BLOCKING_SEVERITIES else warnings).append(entry)
 
         # Check for corresponding memory file
-        mode_rules_dir = rules_dir / f"rules-{slug}"
-        if mode_rules_dir.exists():
-            memory_file = mode_rules_dir / "40-memory-io.md"
-            if not memory_file.exists():
+        mode_rel = MODE_RULES_DIR.format(slug=slug)
+        mode_rules_dir = roo_dir / mode_rel
+        if index.has_dir(mode_rel):
+            if not index.exists(mode_rel, "40-memory-io.md"):
                 errors.append({
                     'mode': slug,
                     'issue': 'Missing corresponding 40-memory-io.md file',
                     'severity': 'ERROR',
-                    'description': f'Expected file: {memory_file}'
+                    'description': f'Expected file: {mode_rules_dir / "40-memory-io.md"}'
                 })
         else:
             warnings.append({
@@ -179,26 +266,30 @@ def validate_memory_protocol_compliance(mode_config, script_dir: Path):
                 'issue': f'Missing mode rules directory: {mode_rules_dir}',
                 'description': 'Mode should have corresponding rules directory with workflow and memory files'
             })
+            continue
 
-        # Check for workflow file with memory integration
-        if mode_rules_dir.exists():
-            workflow_file = mode_rules_dir / "10-workflow.md"
-            if workflow_file.exists():
-                try:
-                    with open(workflow_file, 'r', encoding='utf-8') as f:
-                        workflow_content = f.read()
-                        if 'Memory Consultation' not in workflow_content:
-                            warnings.append({
-                                'mode': slug,
-                                'issue': 'Workflow file missing memory consultation phase',
-                                'description': '10-workflow.md should include Phase 0: Memory Consultation'
-                            })
-                except Exception as e:
-                    warnings.append({
-                        'mode': slug,
-                        'issue': f'Could not read workflow file: {e}',
-                        'description': 'Ensure 10-workflow.md is readable'
-                    })
+        # Check the mode's own rules files (e.g. 10-workflow.md) against modeRules-scope policies
+        for name in sorted(index.files(mode_rel)):
+            applicable = [p for p in mode_policies if fnmatch(name, p['files'])]
+            if not applicable:
+                continue
+            try:
+                text = index.read(mode_rel, name)
+            except Exception as e:
+                warnings.append({
+                    'mode': slug,
+                    'issue': f'Could not read {name}: {e}',
+                    'description': f'Ensure {name} is readable'
+                })
+                continue
+            for finding in check_text(text, applicable):
+                entry = {
+                    'mode': slug,
+                    'issue': format_issue(by_id[finding['policy']], finding),
+                    'severity': finding['severity'],
+                    'description': finding['description']
+                }
+                (errors if finding['severity'] in BLOCKING_SEVERITIES else warnings).append(entry)
 
     return errors, warnings
 
@@ -208,21 +299,17 @@ def validate_security_patterns(mode_config, baseline):
     errors = []
     warnings = []
 
-    ineffective_patterns = [
-        (r'(?!.*\w+)', 'Negative lookahead - use positive allowlist'),
-        (r'\.\*(?!\)|\$)', 'Unanchored wildcard - add ^ and $'),
-    ]
-
     for mode in mode_config['customModes']:
         slug = mode['slug']
 
         for group in mode.get('groups', []):
             if isinstance(group, list) and group[0] == 'edit':
                 regex = group[1].get('fileRegex', '')
+                compiled = re.compile(regex)
 
                 # Check for ineffective patterns
-                for pattern, msg in ineffective_patterns:
-                    if re.search(pattern, regex):
+                for pattern, msg in INEFFECTIVE_PATTERNS:
+                    if pattern.search(regex):
                         warnings.append(f"{slug}: {msg}")
 
                 # Test against forbidden patterns
@@ -233,7 +320,7 @@ def validate_security_patterns(mode_config, baseline):
                         f"lib/{name.replace('_files', '')}-service.ts"
                     ]
                     for test_path in test_paths:
-                        if re.match(regex, test_path):
+                        if compiled.match(test_path):
                             errors.append({
                                 'mode': slug,
                                 'issue': f'Can access forbidden {name}',
@@ -243,94 +330,167 @@ def validate_security_patterns(mode_config, baseline):
 
     return errors, warnings
 
-def main(argv):
-    script_dir = Path(__file__).resolve().parent
-
-    if len(argv) > 2:
-        print("Usage: validate_roomodes.py [optional_path_to_roomodes]", file=sys.stderr)
-        sys.exit(2)
-
-    if len(argv) == 2:
-        target = Path(argv[1]).resolve()
-        if target.is_dir():
-            target = target / ".roomodes"
-    else:
-        root = find_project_root(Path.cwd())
-        if root is None:
-            print("Error: Could not find project root containing `.roomodes` by walking upward from CWD.", file=sys.stderr)
-            sys.exit(1)
-        target = root / ".roomodes"
-
-    if not target.exists():
-        print(f"Error: `{target}` does not exist.", file=sys.stderr)
-        sys.exit(1)
-
-    raw = read_text(target)
-    validate_yaml_tabs_and_indent(raw, INDENT)
-
-    data = yaml.safe_load(raw)
-
-    schema = load_schema(script_dir)
-    v = Draft202012Validator(schema)
-    errors = sorted(v.iter_errors(data), key=lambda e: (list(e.path), e.message))
-    if errors:
-        for e in errors:
-            loc = "/".join(map(str, e.path)) or "(root)"
-            print(f"Schema error at {loc}: {e.message}", file=sys.stderr)
-        sys.exit(1)
-
-    # Load security baseline
+def load_baseline(script_dir: Path):
     baseline_path = script_dir / "security_baseline.json"
     with open(baseline_path, "r", encoding="utf-8") as f:
-        baseline = json.load(f)
+        return json.load(f)
+
+def validate_target(target: Path, validator, baseline, script_dir: Path, index: RulesIndex | None = None, policy=None,
+                    verdicts: VerdictCache | None = None, cache_dir: Path | None = None, artifact=None):
+    """Run every check against one `.roomodes` and collect the lines `main` would print.
+
+    The schema validator and baseline are passed in so callers validating many
+    targets (see batch_validate.py) load and compile them only once. The `.roo/`
+    tree is walked once into a RulesIndex that every rules-tree check queries.
+    With a VerdictCache, schema validation is skipped for content that already passed.
+    With a cache_dir, the parsed `.roomodes` artifact is shared with the other mode tools;
+    callers that already hold the artifact (validate_daemon.py) pass it directly.
+    """
+    result = {"target": str(target), "ok": False, "errors": [], "warnings": []}
+    errors = result["errors"]
+
+    # Formatting is checked on the raw text first: tabs are also YAML syntax errors
+    raw = artifact.raw if artifact is not None else read_text(target)
+    try:
+        validate_yaml_tabs_and_indent(raw, INDENT)
+    except SystemExit as e:
+        errors.append(str(e))
+        return result
+
+    if artifact is None:
+        try:
+            artifact = load_artifact(target, cache_dir, raw)
+        except ArtifactError as e:
+            errors.append(f"Error: {e}")
+            return result
+
+    data = artifact.data
+
+    if verdicts is None or not verdicts.is_valid(artifact.digest):
+        schema_errors = sorted(validator.iter_errors(data), key=lambda e: (list(e.path), e.message))
+        if schema_errors:
+            for e in schema_errors:
+                loc = "/".join(map(str, e.path)) or "(root)"
+                errors.append(f"Schema error at {loc} (line {artifact.line_for(e.path)}): {e.message}")
+            return result
+        if verdicts is not None:
+            verdicts.record(artifact.digest)
 
     # Run structural validation
     struct_errors, struct_warnings = validate_mode_structure(data)
     if struct_errors:
-        print("Structural validation errors:", file=sys.stderr)
+        errors.append("Structural validation errors:")
         for error in struct_errors:
-            print(f"  {error['mode']}: {error['issue']} ({error['severity']})", file=sys.stderr)
-        sys.exit(1)
+            errors.append(f"  {error['mode']}: {error['issue']} ({error['severity']})")
+        return result
+
+    if index is None:
+        index = RulesIndex(script_dir.parent)
 
     # Run memory file naming validation
-    mem_errors, mem_warnings = validate_memory_file_naming(script_dir)
+    mem_errors, mem_warnings = validate_memory_file_naming(script_dir, index)
     if mem_errors:
-        print("Memory file naming validation errors:", file=sys.stderr)
+        errors.append("Memory file naming validation errors:")
         for error in mem_errors:
-            print(f"  {error['mode']}: {error['issue']} ({error['severity']})", file=sys.stderr)
-        sys.exit(1)
+            errors.append(f"  {error['mode']}: {error['issue']} ({error['severity']})")
+        return result
+
+    if policy is None:
+        policy = load_policy(script_dir)
 
     # Run memory protocol compliance validation
-    mem_proto_errors, mem_proto_warnings = validate_memory_protocol_compliance(data, script_dir)
+    mem_proto_errors, mem_proto_warnings = validate_memory_protocol_compliance(data, script_dir, index, policy, artifact)
     if mem_proto_errors:
-        print("Memory protocol compliance validation errors:", file=sys.stderr)
+        errors.append("Memory protocol compliance validation errors:")
         for error in mem_proto_errors:
-            print(f"  {error['mode']}: {error['issue']} ({error['severity']})", file=sys.stderr)
+            errors.append(f"  {error['mode']}: {error['issue']} ({error['severity']})")
             if 'description' in error:
-                print(f"    {error['description']}", file=sys.stderr)
-        sys.exit(1)
+                errors.append(f"    {error['description']}")
+        return result
+
+    # Run content policy validation over rules markdown
+    content_errors, content_warnings = validate_rules_content(index, policy)
+    if content_errors:
+        errors.append("Content policy validation errors:")
+        for error in content_errors:
+            errors.append(f"  {error['mode']}: {error['issue']} ({error['severity']})")
+            if error.get('description'):
+                errors.append(f"    {error['description']}")
+        return result
 
     # Run security validation
     sec_errors, sec_warnings = validate_security_patterns(data, baseline)
     if sec_errors:
-        print("Security validation errors:", file=sys.stderr)
+        errors.append("Security validation errors:")
         for error in sec_errors:
-            print(f"  {error['mode']}: {error['issue']} - {error['path']} ({error['severity']})", file=sys.stderr)
-        sys.exit(1)
+            errors.append(f"  {error['mode']}: {error['issue']} - {error['path']} ({error['severity']})")
+        return result
+
+    # Collect warnings
+    for warning in struct_warnings + sec_warnings + mem_warnings + mem_proto_warnings + content_warnings:
+        if isinstance(warning, dict):
+            result["warnings"].append(f"  {warning['mode']}: {warning['issue']}")
+            if 'description' in warning:
+                result["warnings"].append(f"    {warning['description']}")
+        else:
+            result["warnings"].append(f"  {warning}")
+
+    result["ok"] = True
+    return result
+
+def render_result(result, target: Path):
+    """CLI rendering of a validate_target result: (exit code, stdout lines, stderr lines)."""
+    if not result["ok"]:
+        return 1, [], list(result["errors"])
 
+    out = []
     # Report warnings
-    all_warnings = struct_warnings + sec_warnings + mem_warnings + mem_proto_warnings
-    if all_warnings:
-        print("Warnings:")
-        for warning in all_warnings:
-            if isinstance(warning, dict):
-                print(f"  {warning['mode']}: {warning['issue']}")
-                if 'description' in warning:
-                    print(f"    {warning['description']}")
-            else:
-                print(f"  {warning}")
+    if result["warnings"]:
+        out.append("Warnings:")
+        out.extend(result["warnings"])
+
+    out.append(f"OK: `{target}` formatting, schema, structural, security, and memory file naming validation passed.")
+    return 0, out, []
+
+def main(argv):
+    script_dir = Path(__file__).resolve().parent
+
+    # --no-cache is still accepted; it is the default
+    use_cache = "--cache" in argv
+    argv = [a for a in argv if a not in ("--cache", "--no-cache")]
+
+    if len(argv) > 2:
+        print("Usage: validate_roomodes.py [--cache] [optional_path_to_roomodes]", file=sys.stderr)
+        sys.exit(2)
+
+    if len(argv) == 2:
+        target = Path(argv[1]).resolve()
+        if target.is_dir():
+            target = target / ".roomodes"
+    else:
+        root = find_project_root(Path.cwd())
+        if root is None:
+            print("Error: Could not find project root containing `.roomodes` by walking upward from CWD.", file=sys.stderr)
+            sys.exit(1)
+        target = root / ".roomodes"
+
+    if not target.exists():
+        print(f"Error: `{target}` does not exist.", file=sys.stderr)
+        sys.exit(1)
 
-    print(f"OK: `{target}` formatting, schema, structural, security, and memory file naming validation passed.")
+    validator = LazyValidator(load_schema(script_dir))
+    baseline = load_baseline(script_dir)
+    # Written next to the validated project, like the summarizer's cache
+    cache_dir = target.parent / ".roo" / ".cache" if use_cache else None
+    verdicts = VerdictCache(cache_dir / "schema_verdicts.json", schema_digest(script_dir)) if use_cache else None
+    result = validate_target(target, validator, baseline, script_dir, verdicts=verdicts, cache_dir=cache_dir)
+
+    code, out, err = render_result(result, target)
+    for line in err:
+        print(line, file=sys.stderr)
+    for line in out:
+        print(line)
+    sys.exit(code)
 
 if __name__ == "__main__":
     main(sys.argv)
\ No newline at end of file
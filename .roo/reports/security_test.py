@@ -1,14 +1,17 @@
 import json
 import re
-import yaml
+import sys
+from pathlib import Path
+
+sys.path.insert(0, '.roo/mode-tools')
+from roomodes_artifact import load_artifact
 
 # Load security baseline
 with open('.roo/mode-tools/security_baseline.json', 'r') as f:
     baseline = json.load(f)
 
-# Load roomodes
-with open('.roomodes', 'r', encoding='utf-8') as f:
-    config = yaml.safe_load(f)
+# Load roomodes (shared parse-once artifact)
+config = load_artifact(Path('.roomodes'), Path('.roo/.cache')).data
 
 print('Testing fileRegex patterns against security baseline...')
 print('=' * 60)
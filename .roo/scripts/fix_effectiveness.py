@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fix Effectiveness Analytics
+Derives fix reuse, fix success and command failure statistics from the memory graph
+(70-memory-lifecycle-policy.md: "Fix Effectiveness Tracking" and "Command Pattern Analysis").
+
+Usage:
+    python fix_effectiveness.py --graph graph.json [--top 10]
+
+Derivation:
+- applications: Run -[:APPLIES]-> Fix edges (distinct runs per fix)
+- resolves:     Fix -[:RESOLVES|MITIGATES]-> Error|Warning edges
+- outcomes:     fix.outcome observations (on the Fix, or on any entity via data.fixId) and
+                Fix -[:HAS_OUTCOME]-> outcome#<status>#... entities without observations
+- commands:     Run -[:EXECUTES]-> Command, failed when the run's command.exec exitCode != 0
+                (a Command's own command.exec observations when no run links to it),
+                grouped by canonical form (cmd#<canonical>#<fp8>)
+
+Entity names are interned to integer IDs and every count lives in an array('l') column indexed
+by ID, so the whole graph is tallied in one pass over relations and one over observations.
+"""
+
+import sys
+import json
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from memory_retrieval import obs_data, parse_observation
+
+SUCCESS = "verified_successful"
+PARTIAL = "partially_effective"
+FAILED = "failed"
+
+
+def canonical_command(name: str) -> str:
+    """cmd#<canonical-cmd>#<fp8> -> <canonical-cmd>"""
+    parts = name.split("#")
+    return "#".join(parts[1:-1]) if len(parts) >= 3 else name
+
+
+def _column(n: int) -> array:
+    return array("l", [0]) * n
+
+
+class FixEffectiveness:
+    def __init__(self, graph: Dict[str, Any]):
+        entities = graph.get("entities", [])
+        self.names: List[str] = [e["name"] for e in entities]
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.types: List[str] = [e.get("entityType") or e.get("type") or "" for e in entities]
+        n = len(self.names)
+
+        self.applications = _column(n)
+        self.resolves = _column(n)
+        self.successes = _column(n)
+        self.partials = _column(n)
+        self.failures = _column(n)
+        self.executions = _column(n)
+        self.exec_failures = _column(n)
+        self.emits = _column(n)
+
+        # Run id -> ids of the commands it executed
+        run_commands: Dict[int, List[int]] = {}
+        outcome_links: List[tuple] = []
+        ids = self.ids
+        for rel in graph.get("relations", []):
+            src, dst = ids.get(rel["from"]), ids.get(rel["to"])
+            if src is None or dst is None:
+                continue
+            kind = rel["relationType"]
+            if kind == "APPLIES":
+                self.applications[dst] += 1
+            elif kind in ("RESOLVES", "MITIGATES") and self.types[src] == "Fix":
+                self.resolves[src] += 1
+            elif kind == "EXECUTES":
+                run_commands.setdefault(src, []).append(dst)
+            elif kind == "EMITS":
+                self.emits[src] += 1
+            elif kind == "HAS_OUTCOME":
+                outcome_links.append((src, dst))
+
+        # Commands reached from a Run are counted from the run, not again from their own observations
+        linked = {cmd for cmds in run_commands.values() for cmd in cmds}
+        seen_outcomes = set()
+        has_outcome_obs = set()
+        for i, entity in enumerate(entities):
+            for raw in entity.get("observations", []):
+                obs = parse_observation(raw)
+                if obs is None:
+                    continue
+                kind, data = obs.get("type"), obs_data(obs)
+                if kind == "fix.outcome":
+                    fix = ids.get(data.get("fixId"), i)
+                    key = (fix, data.get("status"), obs.get("ts"))
+                    if key not in seen_outcomes:
+                        seen_outcomes.add(key)
+                        self._count_outcome(fix, data.get("status"))
+                    has_outcome_obs.add(i)
+                elif kind == "command.exec":
+                    failed = data.get("exitCode") not in (0, None)
+                    if i in run_commands:
+                        commands = run_commands[i]
+                    else:
+                        commands = [i] if self.types[i] == "Command" and i not in linked else []
+                    for cmd in commands:
+                        self.executions[cmd] += 1
+                        self.exec_failures[cmd] += failed
+
+        for fix, outcome in outcome_links:
+            if outcome not in has_outcome_obs:
+                parts = self.names[outcome].split("#")
+                self._count_outcome(fix, parts[1] if len(parts) >= 3 else None)
+
+    def _count_outcome(self, fix: int, status: Optional[str]) -> None:
+        if status == SUCCESS:
+            self.successes[fix] += 1
+        elif status == PARTIAL:
+            self.partials[fix] += 1
+        elif status == FAILED:
+            self.failures[fix] += 1
+
+    def fix_ids(self) -> List[int]:
+        return [i for i, t in enumerate(self.types) if t == "Fix"]
+
+    def fix_stats(self, i: int) -> Dict[str, Any]:
+        outcomes = self.successes[i] + self.partials[i] + self.failures[i]
+        applications = self.applications[i]
+        return {
+            "name": self.names[i],
+            "applications": applications,
+            "resolves": self.resolves[i],
+            "outcomes": outcomes,
+            # verified_successful / total_applications, per the lifecycle policy
+            "success_ratio": round(self.successes[i] / max(applications, outcomes), 3) if max(applications, outcomes) else None,
+        }
+
+    def command_stats(self) -> List[Dict[str, Any]]:
+        groups: Dict[str, List[int]] = {}
+        for i, t in enumerate(self.types):
+            if t == "Command":
+                totals = groups.setdefault(canonical_command(self.names[i]), [0, 0, 0])
+                totals[0] += self.executions[i]
+                totals[1] += self.exec_failures[i]
+                totals[2] += self.emits[i]
+        return [{"command": cmd, "executions": e, "failures": f, "errors_emitted": emitted,
+                 "failure_rate": round(f / e, 3) if e else None}
+                for cmd, (e, f, emitted) in groups.items()]
+
+    def summary(self) -> Dict[str, Any]:
+        fixes = self.fix_ids()
+        applied = sum(1 for i in fixes if self.applications[i] > 0)
+        reused = sum(1 for i in fixes if self.applications[i] > 1)
+        # Same denominator as success_ratio: outcomes can be recorded without an APPLIES edge
+        applications = sum(max(self.applications[i], self.successes[i] + self.partials[i] + self.failures[i])
+                           for i in fixes)
+        successes = sum(self.successes[i] for i in fixes)
+        return {
+            "total_fixes": len(fixes),
+            "applied_fixes": applied,
+            "reused_fixes": reused,
+            "fix_reuse_rate": reused / len(fixes) if fixes else None,
+            "fix_success_rate": successes / applications if applications else None,
+        }
+
+    def top_fixes(self, n: int = 10) -> List[Dict[str, Any]]:
+        ranked = sorted(self.fix_ids(), key=lambda i: (-self.applications[i], -self.successes[i], self.names[i]))
+        return [self.fix_stats(i) for i in ranked[:n]]
+
+    def failing_commands(self, n: int = 10) -> List[Dict[str, Any]]:
+        stats = [c for c in self.command_stats() if c["failures"]]
+        return sorted(stats, key=lambda c: (-c["failure_rate"], -c["failures"], c["command"]))[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fix effectiveness and command failure analytics")
+    parser.add_argument("--graph", type=Path, required=True, help="JSON export of read_graph()")
+    parser.add_argument("--top", type=int, default=10, help="Fixes and commands to list")
+
+    args = parser.parse_args()
+
+    with open(args.graph, "r", encoding="utf-8") as f:
+        analytics = FixEffectiveness(json.load(f))
+
+    json.dump({
+        "summary": analytics.summary(),
+        "top_fixes": analytics.top_fixes(args.top),
+        "failing_commands": analytics.failing_commands(args.top),
+    }, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ Validates memory MCP integration health and provides diagnostics.
 
 Usage:
     python memory-health-check.py [--mode <mode_slug>] [--verbose]
+    python memory-health-check.py --textfile <node_exporter_textfile_dir>/roo_memory.prom
+    python memory-health-check.py --serve 127.0.0.1:9464 [--interval 60]
 
 Checks performed:
 - Memory MCP connectivity
@@ -13,15 +15,22 @@ Checks performed:
 - Observation envelope quality
 - Relation consistency
 - Memory protocol compliance
+- Memory MCP query latency (P95 alert > 5 s, per 70-memory-lifecycle-policy.md)
+
+Metrics can be exported in Prometheus format (see memory_metrics_exporter.py).
 """
 
 import sys
 import json
+import time
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from fix_effectiveness import FixEffectiveness
+from memory_metrics_exporter import QUERY_P95_ALERT_SECONDS, percentile
+
 # Mock MCP client for demonstration - replace with actual MCP integration
 class MockMemoryMCP:
     def __init__(self):
@@ -64,12 +73,22 @@ class MemoryHealthChecker:
         self.issues = []
         self.warnings = []
         self.metrics = {}
+        self.check_durations: Dict[str, float] = {}
+        self.query_durations: List[tuple] = []
+
+    def _query(self, method: str, *args) -> Dict[str, Any]:
+        """Call a Memory MCP method, recording its latency"""
+        start = time.perf_counter()
+        try:
+            return getattr(self.mcp, method)(*args)
+        finally:
+            self.query_durations.append((method, time.perf_counter() - start))
 
     def check_connectivity(self) -> bool:
         """Check if Memory MCP is accessible"""
         try:
             # Test basic connectivity
-            result = self.mcp.search_nodes("type:Run LIMIT 1")
+            result = self._query("search_nodes", "type:Run LIMIT 1")
             self.metrics["mcp_connected"] = True
             return True
         except Exception as e:
@@ -86,7 +105,7 @@ class MemoryHealthChecker:
         cutoff = datetime.now() - timedelta(hours=hours)
 
         try:
-            runs = self.mcp.search_nodes(f"type:Run timestamp > {cutoff.isoformat()}")
+            runs = self._query("search_nodes", f"type:Run timestamp > {cutoff.isoformat()}")
 
             mode_activity = {}
             for run in runs.get("nodes", []):
@@ -125,18 +144,20 @@ class MemoryHealthChecker:
     def check_fix_reuse_patterns(self) -> None:
         """Analyze how often modes reuse learned fixes"""
         try:
-            # Get all fixes and their application counts
-            fixes = self.mcp.search_nodes("type:Fix")
+            # Application and outcome counts are derived from APPLIES/HAS_OUTCOME relations
+            # and fix.outcome observations; Fix nodes carry no counters of their own
+            analytics = FixEffectiveness(self._query("read_graph"))
+            summary = analytics.summary()
 
-            total_fixes = len(fixes.get("nodes", []))
-            applied_fixes = sum(1 for fix in fixes.get("nodes", [])
-                               if fix.get("application_count", 0) > 1)
+            self.metrics["total_fixes"] = summary["total_fixes"]
+            self.metrics["reused_fixes"] = summary["reused_fixes"]
+            self.metrics["failing_commands"] = len(analytics.failing_commands(n=sys.maxsize))
 
-            self.metrics["total_fixes"] = total_fixes
-            self.metrics["reused_fixes"] = applied_fixes
+            if summary["fix_success_rate"] is not None:
+                self.metrics["fix_success_rate"] = summary["fix_success_rate"]
 
-            if total_fixes > 0:
-                reuse_rate = applied_fixes / total_fixes
+            if summary["total_fixes"] > 0:
+                reuse_rate = summary["fix_reuse_rate"]
                 self.metrics["fix_reuse_rate"] = reuse_rate
 
                 if reuse_rate < 0.1:  # Less than 10% reuse
@@ -156,7 +177,7 @@ class MemoryHealthChecker:
     def check_observation_quality(self) -> None:
         """Validate observation envelope completeness"""
         try:
-            graph = self.mcp.read_graph()
+            graph = self._query("read_graph")
             entities = graph.get("entities", [])
 
             quality_issues = []
@@ -191,7 +212,7 @@ class MemoryHealthChecker:
     def check_relation_consistency(self) -> None:
         """Validate that relations are consistent and complete"""
         try:
-            graph = self.mcp.read_graph()
+            graph = self._query("read_graph")
             relations = graph.get("relations", [])
 
             # Check for orphaned entities
@@ -226,6 +247,9 @@ class MemoryHealthChecker:
                     "message": f"Found {len(fixes_without_errors)} fixes not linked to errors"
                 })
 
+            self.metrics["graph_entities"] = len(entities)
+            self.metrics["graph_relations"] = len(relations)
+            self.metrics["graph_observations"] = sum(len(e.get("observations", [])) for e in entities.values())
             self.metrics["orphaned_relations"] = len(orphaned_relations)
             self.metrics["unlinked_fixes"] = len(fixes_without_errors)
 
@@ -236,6 +260,27 @@ class MemoryHealthChecker:
                 "message": f"Failed to check relation consistency: {e}"
             })
 
+    def check_query_latency(self) -> None:
+        """Flag slow Memory MCP queries (P95 > 5 s triggers index optimization)
+
+        Only the checker's own read_graph/search_nodes calls are sampled, not other clients' traffic.
+        """
+        p95 = percentile([seconds for _, seconds in self.query_durations], 95)
+        self.metrics["query_p95_seconds"] = p95
+        if p95 > QUERY_P95_ALERT_SECONDS:
+            self.warnings.append({
+                "check": "query_latency",
+                "severity": "WARNING",
+                "message": f"Memory query P95 {p95:.2f}s exceeds {QUERY_P95_ALERT_SECONDS:g}s - index optimization needed"
+            })
+
+    def _timed(self, name: str, check) -> None:
+        start = time.perf_counter()
+        try:
+            check()
+        finally:
+            self.check_durations[name] = time.perf_counter() - start
+
     def generate_report(self, verbose: bool = False) -> str:
         """Generate a comprehensive health report"""
         report_lines = []
@@ -266,8 +311,10 @@ class MemoryHealthChecker:
         # Metrics
         report_lines.append("METRICS:")
         for key, value in self.metrics.items():
-            if isinstance(value, float):
+            if isinstance(value, float) and key.endswith("_rate"):
                 report_lines.append(f"  {key}: {value:.2%}")
+            elif isinstance(value, float):
+                report_lines.append(f"  {key}: {value:.3f}")
             else:
                 report_lines.append(f"  {key}: {value}")
         report_lines.append("")
@@ -315,14 +362,16 @@ class MemoryHealthChecker:
 
     def run_all_checks(self, verbose: bool = False) -> str:
         """Run all health checks and return report"""
-        print("Running memory health checks...")
+        # stderr keeps stdout for the report (and quiet when run under --serve)
+        print("Running memory health checks...", file=sys.stderr)
 
-        self.check_connectivity()
+        self._timed("connectivity", self.check_connectivity)
         if self.metrics.get("mcp_connected"):
-            self.check_recent_activity()
-            self.check_fix_reuse_patterns()
-            self.check_observation_quality()
-            self.check_relation_consistency()
+            self._timed("recent_activity", self.check_recent_activity)
+            self._timed("fix_reuse", self.check_fix_reuse_patterns)
+            self._timed("observation_quality", self.check_observation_quality)
+            self._timed("relation_consistency", self.check_relation_consistency)
+        self.check_query_latency()
 
         return self.generate_report(verbose)
 
@@ -331,14 +380,26 @@ def main():
     parser.add_argument("--mode", help="Check specific mode only")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--hours", type=int, default=24, help="Hours to look back for activity")
+    parser.add_argument("--textfile", type=Path, help="Also write Prometheus metrics to this node-exporter textfile (.prom)")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="Serve Prometheus metrics on /metrics instead of printing a report")
+    parser.add_argument("--interval", type=float, default=60.0, help="Minimum seconds between check runs when serving")
 
     args = parser.parse_args()
 
+    if args.serve:
+        from memory_metrics_exporter import serve
+        serve(MemoryHealthChecker, args.serve, args.interval)
+        return
+
     checker = MemoryHealthChecker()
     report = checker.run_all_checks(verbose=args.verbose)
 
     print(report)
 
+    if args.textfile:
+        from memory_metrics_exporter import write_textfile
+        write_textfile(checker, args.textfile)
+
     # Exit with error code if there are critical issues
     critical_issues = [i for i in checker.issues if i["severity"] == "CRITICAL"]
     if critical_issues:
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Versioned Memory Store
+Compare-and-swap write layer implementing 90-concurrency-and-conflicts.md.
+
+Usage:
+    from memory_cas import VersionedStore, optimistic_update
+
+    store = VersionedStore(Path(".roo/.cache/memory.sqlite"))
+    optimistic_update(store, "fix#ts-node#a1b2c3d4", lambda e: {**e, "observations": e["observations"] + [obs]})
+
+Behavior:
+- Every entity carries a monotonically increasing `version` and `lastModified`.
+- write_batch() applies a group of entity writes, deletes and relation changes in one transaction,
+  only if every entity is still at its expected version (0 = must not exist yet); otherwise
+  nothing is written and VersionConflict lists each mismatch. Deleted entities can be moved to
+  `archived_entities` together with their relations.
+- optimistic_update()/optimistic_batch_update() run the read → apply → conditional write → retry
+  protocol with exponential backoff (base_delay * 2^attempt, jittered) and one of the resolution
+  strategies: retry (re-apply on fresh data), merge (union observations into the current entity),
+  last_writer_wins (write unconditionally) or fail (raise for escalation).
+- The store is SQLite in WAL mode, safe across threads (one connection per thread) and processes.
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, NamedTuple
+
+STRATEGIES = ("retry", "merge", "last_writer_wins", "fail")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    name TEXT PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    last_modified TEXT NOT NULL,
+    observations TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS relations (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    relation_type TEXT NOT NULL,
+    PRIMARY KEY (src, dst, relation_type)
+);
+CREATE INDEX IF NOT EXISTS idx_relations_dst ON relations(dst, relation_type);
+CREATE TABLE IF NOT EXISTS archived_entities (
+    name TEXT NOT NULL,
+    archived_at TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (name, archived_at)
+);
+"""
+
+
+class VersionConflict(Exception):
+    def __init__(self, conflicts: List[Dict[str, Any]]):
+        self.conflicts = conflicts
+        names = ", ".join(f"{c['name']} (expected v{c['expectedVersion']}, found v{c['currentVersion']})" for c in conflicts)
+        super().__init__(f"Version conflict on {names}")
+
+
+class UpdateResult(NamedTuple):
+    entities: Dict[str, Dict[str, Any]]
+    retries: int
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _row_to_entity(row) -> Dict[str, Any]:
+    return {"name": row[0], "entityType": row[1], "version": row[2], "lastModified": row[3],
+            "observations": json.loads(row[4])}
+
+
+class VersionedStore:
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # One connection per thread, re-opened after fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def read(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.read_many([name]).get(name)
+
+    def read_many(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        marks = ",".join("?" * len(names))
+        rows = self.conn.execute(
+            f"SELECT name, entity_type, version, last_modified, observations FROM entities WHERE name IN ({marks})",
+            list(names)).fetchall()
+        return {row[0]: _row_to_entity(row) for row in rows}
+
+    def scan(self, after: str = "", limit: int = 500) -> List[Dict[str, Any]]:
+        """Entities in name order after `after` (keyset pagination for chunked jobs)"""
+        rows = self.conn.execute(
+            "SELECT name, entity_type, version, last_modified, observations FROM entities WHERE name > ? "
+            "ORDER BY name LIMIT ?", (after, limit)).fetchall()
+        return [_row_to_entity(row) for row in rows]
+
+    def relations(self, name: str) -> List[Dict[str, str]]:
+        rows = self.conn.execute("SELECT src, dst, relation_type FROM relations WHERE src = ? OR dst = ?",
+                                 (name, name)).fetchall()
+        return [{"from": r[0], "to": r[1], "relationType": r[2]} for r in rows]
+
+    def write_batch(self, entities: List[Dict[str, Any]], relations: List[Dict[str, str]] = (),
+                    conditional: bool = True, deletes: List[Dict[str, Any]] = (),
+                    drop_relations: List[Dict[str, str]] = (), archive: Optional[str] = None) -> Dict[str, int]:
+        """
+        Write `entities` (each with the `version` it was read at; 0 or absent = new), delete
+        `deletes` (name + version read at) and add/drop relations atomically. With `archive`
+        (a reason), deleted entities and their relations are copied to archived_entities first.
+        Returns {name: new version}; raises VersionConflict if any entity moved on since it was
+        read, in which case nothing is written.
+        """
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            checked = list(entities) + list(deletes)
+            names = [e["name"] for e in checked]
+            marks = ",".join("?" * len(names))
+            current = dict(conn.execute(f"SELECT name, version FROM entities WHERE name IN ({marks})", names).fetchall()) \
+                if names else {}
+            conflicts = [{"name": e["name"], "expectedVersion": e.get("version", 0), "currentVersion": current.get(e["name"], 0)}
+                         for e in checked if conditional and current.get(e["name"], 0) != e.get("version", 0)]
+            if conflicts:
+                raise VersionConflict(conflicts)
+
+            now = _now()
+            versions = {}
+            for e in entities:
+                versions[e["name"]] = current.get(e["name"], 0) + 1
+                conn.execute(
+                    "INSERT INTO entities (name, entity_type, version, last_modified, observations) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET version = excluded.version, last_modified = excluded.last_modified, "
+                    "observations = excluded.observations",
+                    (e["name"], e.get("entityType", ""), versions[e["name"]], now, json.dumps(e.get("observations", []))))
+            for d in deletes:
+                if archive:
+                    row = conn.execute("SELECT name, entity_type, version, last_modified, observations FROM entities "
+                                       "WHERE name = ?", (d["name"],)).fetchone()
+                    rels = conn.execute("SELECT src, dst, relation_type FROM relations WHERE src = ? OR dst = ?",
+                                        (d["name"], d["name"])).fetchall()
+                    if row is not None:
+                        payload = {**_row_to_entity(row), "relations": [{"from": r[0], "to": r[1], "relationType": r[2]}
+                                                                        for r in rels]}
+                        conn.execute("INSERT OR REPLACE INTO archived_entities (name, archived_at, reason, payload) "
+                                     "VALUES (?, ?, ?, ?)", (d["name"], now, archive, json.dumps(payload)))
+                    conn.execute("DELETE FROM relations WHERE src = ? OR dst = ?", (d["name"], d["name"]))
+                conn.execute("DELETE FROM entities WHERE name = ?", (d["name"],))
+            conn.executemany("DELETE FROM relations WHERE src = ? AND dst = ? AND relation_type = ?",
+                             [(r["from"], r["to"], r["relationType"]) for r in drop_relations])
+            conn.executemany("INSERT OR IGNORE INTO relations (src, dst, relation_type) VALUES (?, ?, ?)",
+                             [(r["from"], r["to"], r["relationType"]) for r in relations])
+            conn.execute("COMMIT")
+            return versions
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def merge_entities(current: Optional[Dict[str, Any]], mine: Dict[str, Any]) -> Dict[str, Any]:
+    """Union of observations (order kept, current first); the existing entity type always wins"""
+    if current is None:
+        return {**mine, "version": 0}
+    seen, observations = set(), []
+    for obs in current["observations"] + mine.get("observations", []):
+        key = obs if isinstance(obs, str) else json.dumps(obs, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            observations.append(obs)
+    return {**current, "observations": observations}
+
+
+def backoff(attempt: int, base_delay: float) -> None:
+    """Exponential backoff with jitter so contending writers do not retry in lockstep"""
+    time.sleep(base_delay * (2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+def optimistic_batch_update(store: VersionedStore, names: List[str],
+                            update_fn: Callable[[Dict[str, Optional[Dict[str, Any]]]], Dict[str, Dict[str, Any]]],
+                            relations: List[Dict[str, str]] = (), strategy: str = "retry",
+                            max_retries: int = 3, base_delay: float = 0.1) -> UpdateResult:
+    """
+    Read `names`, apply `update_fn({name: entity or None}) -> {name: updated entity}` and write the
+    result conditionally in one batch, resolving version conflicts with `strategy`.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+
+    current = store.read_many(names)
+    updated = update_fn({n: current.get(n) for n in names})
+    for attempt in range(max_retries + 1):
+        batch = [{**e, "version": current[n]["version"] if n in current else 0} for n, e in updated.items()]
+        try:
+            versions = store.write_batch(batch, relations, conditional=strategy != "last_writer_wins")
+            return UpdateResult({n: {**e, "version": versions[n]} for n, e in updated.items()}, attempt)
+        except VersionConflict:
+            if strategy == "fail" or attempt == max_retries:
+                raise
+        backoff(attempt, base_delay)
+        current = store.read_many(names)
+        if strategy == "retry":
+            updated = update_fn({n: current.get(n) for n in names})
+        else:
+            updated = {n: merge_entities(current.get(n), e) for n, e in updated.items()}
+    raise AssertionError("unreachable")
+
+
+def optimistic_update(store: VersionedStore, name: str,
+                      update_fn: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]], **kwargs) -> UpdateResult:
+    """Single-entity form of optimistic_batch_update"""
+    return optimistic_batch_update(store, [name], lambda entities: {name: update_fn(entities[name])}, **kwargs)
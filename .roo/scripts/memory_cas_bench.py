@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Memory CAS Contention Benchmark
+Measures throughput and retry rates of optimistic writes as concurrent writers grow.
+
+Usage:
+    python memory_cas_bench.py [--writers 1,2,4,8,16] [--executor thread,process]
+                               [--ops 200] [--entities 4] [--strategy retry] [--json]
+
+Each writer appends one observation per operation to one of --entities hot Fix entities through
+optimistic_update(). Fewer entities means more contention. After every round the store is
+checked for lost updates: each entity's version and observation count must equal the number of
+successful writes to it.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any
+
+from memory_cas import VersionConflict, VersionedStore, optimistic_update
+
+# Per-process store, opened once by _init_worker (process pools) or shared (thread pools)
+_STORE: Dict[str, VersionedStore] = {}
+
+
+def _init_worker(db_path: str) -> None:
+    _STORE["store"] = VersionedStore(Path(db_path))
+
+
+def _writer(args) -> Dict[str, Any]:
+    writer_id, ops, entities, strategy, max_retries, base_delay = args
+    store = _STORE["store"]
+    rng = random.Random(writer_id)
+    done = retries = failures = 0
+    for i in range(ops):
+        name = f"fix#bench#{rng.randrange(entities):08x}"
+        obs = {"type": "fix.outcome", "writer": writer_id, "seq": i}
+
+        def apply(entity):
+            current = entity["observations"] if entity else []
+            return {"name": name, "entityType": "Fix", "observations": current + [obs]}
+
+        try:
+            result = optimistic_update(store, name, apply, strategy=strategy,
+                                       max_retries=max_retries, base_delay=base_delay)
+            done += 1
+            retries += result.retries
+        except VersionConflict:
+            failures += 1
+            retries += max_retries
+    return {"done": done, "retries": retries, "failures": failures}
+
+
+def run_round(executor: str, writers: int, ops: int, entities: int, strategy: str,
+              max_retries: int, base_delay: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.sqlite")
+        _init_worker(db_path)
+        jobs = [(w, ops, entities, strategy, max_retries, base_delay) for w in range(writers)]
+        start = time.perf_counter()
+        if executor == "process":
+            with ProcessPoolExecutor(max_workers=writers, initializer=_init_worker, initargs=(db_path,)) as pool:
+                results = list(pool.map(_writer, jobs))
+        else:
+            with ThreadPoolExecutor(max_workers=writers) as pool:
+                results = list(pool.map(_writer, jobs))
+        elapsed = time.perf_counter() - start
+
+        done = sum(r["done"] for r in results)
+        retries = sum(r["retries"] for r in results)
+        store = _STORE["store"]
+        rows = store.conn.execute("SELECT version, observations FROM entities").fetchall()
+        stored = sum(len(json.loads(obs)) for _, obs in rows)
+        versions = sum(v for v, _ in rows)
+        store.conn.close()
+        _STORE.clear()
+
+    return {
+        "executor": executor,
+        "writers": writers,
+        "ops": writers * ops,
+        "committed": done,
+        "failed": sum(r["failures"] for r in results),
+        "ops_per_sec": round(done / elapsed, 1),
+        "retries_per_op": round(retries / max(writers * ops, 1), 3),
+        "lost_updates": (done - stored) if strategy != "last_writer_wins" else None,
+        "versions_consistent": versions == done,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contention benchmark for the versioned memory store")
+    parser.add_argument("--writers", default="1,2,4,8,16", help="Comma-separated writer counts")
+    parser.add_argument("--executor", default="thread,process", help="thread, process or both")
+    parser.add_argument("--ops", type=int, default=200, help="Writes per writer")
+    parser.add_argument("--entities", type=int, default=4, help="Hot entities shared by all writers")
+    parser.add_argument("--strategy", default="retry", choices=["retry", "merge", "last_writer_wins", "fail"])
+    parser.add_argument("--max-retries", type=int, default=10)
+    parser.add_argument("--base-delay", type=float, default=0.001, help="Backoff base in seconds")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    args = parser.parse_args()
+
+    rounds = [run_round(ex, w, args.ops, args.entities, args.strategy, args.max_retries, args.base_delay)
+              for ex in args.executor.split(",") for w in map(int, args.writers.split(","))]
+
+    if args.json:
+        print(json.dumps(rounds, indent=2))
+    else:
+        print(f"{'executor':<8} {'writers':>7} {'ops/s':>9} {'retries/op':>10} {'failed':>6} {'lost':>5}")
+        for r in rounds:
+            print(f"{r['executor']:<8} {r['writers']:>7} {r['ops_per_sec']:>9} {r['retries_per_op']:>10} "
+                  f"{r['failed']:>6} {r['lost_updates'] if r['lost_updates'] is not None else '-':>5}")
+
+    if any(r["lost_updates"] or not r["versions_consistent"] for r in rounds if r["lost_updates"] is not None):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Memory Lifecycle Maintenance
+Runs the daily/weekly/monthly jobs of 70-memory-lifecycle-policy.md against the versioned memory
+store (memory_cas.py) in small, resumable, budgeted chunks.
+
+Usage:
+    python memory_maintenance.py --db .roo/.cache/memory.sqlite --schedule daily
+                                 [--jobs consolidate_duplicates,refresh_summaries]
+                                 [--budget-seconds 30] [--budget-cpu 10] [--chunk-size 200]
+                                 [--pause 0.05] [--reset] [--status]
+
+Jobs:
+- consolidate_duplicates: merge entities whose names collapse to the same key (err#/warn# by the
+  normalizedKey rules of 10-idempotency-policy.md, taxonomy names case/whitespace-insensitively),
+  migrating relations and observations to the canonical entity
+- archive_expired: move Run/Command entities past their active retention to archived_entities
+- refresh_summaries: per-entity statistics for Command/Error/Warning/Fix in entity_summaries
+- validate_integrity: envelope, naming and dangling-relation checks (reported, not repaired)
+- cleanup_orphaned_relations: delete relations whose endpoints no longer exist
+
+Behavior:
+- Each job walks the store in --chunk-size keyset pages; every chunk is one short transaction,
+  followed by a checkpoint (maintenance_checkpoints table) and a --pause so modes writing memory
+  get the write lock between chunks. WAL readers are never blocked.
+- The window stops between chunks once --budget-seconds of wall time or --budget-cpu of process
+  CPU time is spent; the next run resumes each unfinished job from its checkpoint.
+- A finished job records the store's input signature (entity count, version sum, last write,
+  relation count and checksum); it is skipped until that signature changes. Time-dependent jobs
+  (archive_expired) also sign the current UTC date, so entities still age out of an idle store.
+  refresh_summaries additionally skips entities whose version matches their stored summary.
+- All entity writes and deletes are conditional on the version read (compare-and-swap); a group
+  that lost a race with a mode is left for the next run rather than retried inside the window.
+"""
+
+import re
+import sys
+import json
+import time
+import zlib
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from memory_cas import VersionConflict, VersionedStore, merge_entities
+from memory_retrieval import obs_data, parse_observation, ts_value
+from fix_effectiveness import FAILED, PARTIAL, SUCCESS
+
+SCHEDULES = {
+    "daily": ["consolidate_duplicates", "archive_expired", "refresh_summaries"],
+    "weekly": ["consolidate_duplicates", "archive_expired", "validate_integrity"],
+    "monthly": ["refresh_summaries", "cleanup_orphaned_relations"],
+}
+SCHEDULES["all"] = list(dict.fromkeys(job for jobs in SCHEDULES.values() for job in jobs))
+
+# Active retention before an entity is moved to archived_entities
+ARCHIVE_AFTER_DAYS = {"Run": 90, "Command": 180}
+
+# Jobs whose result depends on the clock as well as the store contents
+TIME_DEPENDENT_JOBS = ("archive_expired",)
+
+SUMMARY_TYPES = ("Command", "Error", "Warning", "Fix")
+
+PREFIX_TYPES = {
+    "run": "Run", "cmd": "Command", "err": "Error", "warn": "Warning", "dep": "Dependency",
+    "fix": "Fix", "doc": "Doc", "mode": "Mode", "tool": "Tool", "file": "File", "concept": "Concept",
+}
+
+# Prefixes whose names carry no fingerprint and may drift in case/spacing/versions
+ISSUE_PREFIXES = ("err", "warn")
+TAXONOMY_PREFIXES = ("mode", "tool", "concept", "dep")
+
+MAX_ISSUE_SAMPLES = 20
+
+HASH_RE = re.compile(r"\b(?:0x)?[0-9a-f]{7,64}\b")
+SEMVER_RE = re.compile(r"\bv?\d+\.\d+(?:\.\d+)?(?:[-+][0-9a-z.-]+)?\b")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS maintenance_checkpoints (
+    job TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    cursor TEXT,
+    input_sig TEXT,
+    started_at TEXT,
+    updated_at TEXT NOT NULL,
+    stats TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS maintenance_keys (
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (key, name)
+);
+CREATE TABLE IF NOT EXISTS entity_summaries (
+    name TEXT PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    refreshed_at TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _relation_crc(src: str, dst: str, relation_type: str) -> int:
+    return zlib.crc32(f"{src}\x1f{dst}\x1f{relation_type}".encode("utf-8"))
+
+
+def normalized_key(text: str) -> str:
+    """lowercase(message) -> strip hashes -> collapse semver -> squeeze spaces"""
+    text = HASH_RE.sub("", text.lower())
+    text = SEMVER_RE.sub("x.y.z", text)
+    return " ".join(text.split())
+
+
+def consolidation_key(name: str) -> Optional[str]:
+    """Key that duplicate entities share, or None if the name is fingerprinted and never merged"""
+    prefix, sep, rest = name.partition("#")
+    if not sep:
+        return None
+    if prefix in ISSUE_PREFIXES:
+        return f"{prefix}#{normalized_key(rest)}"
+    if prefix in TAXONOMY_PREFIXES:
+        return f"{prefix}#{' '.join(rest.lower().split())}"
+    return None
+
+
+def last_activity(entity: Dict[str, Any]) -> float:
+    """Newest observation timestamp, falling back to the store's lastModified when there is none"""
+    stamps = [ts_value(obs.get("ts")) for obs in map(parse_observation, entity["observations"]) if obs is not None]
+    newest = max(stamps, default=0.0)
+    return newest or ts_value(entity.get("lastModified"))
+
+
+class Budget:
+    """Wall-clock and CPU allowance for one maintenance window"""
+
+    def __init__(self, seconds: Optional[float], cpu_seconds: Optional[float]):
+        self.seconds = seconds
+        self.cpu_seconds = cpu_seconds
+        self.wall_start = time.monotonic()
+        self.cpu_start = time.process_time()
+
+    def used(self) -> Dict[str, float]:
+        return {"wall_seconds": round(time.monotonic() - self.wall_start, 3),
+                "cpu_seconds": round(time.process_time() - self.cpu_start, 3)}
+
+    def exhausted(self) -> bool:
+        used = self.used()
+        return ((self.seconds is not None and used["wall_seconds"] >= self.seconds) or
+                (self.cpu_seconds is not None and used["cpu_seconds"] >= self.cpu_seconds))
+
+
+class MaintenanceRunner:
+    def __init__(self, store: VersionedStore, chunk_size: int = 200, pause: float = 0.05):
+        self.store = store
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.store.conn.executescript(SCHEMA)
+        self.store.conn.create_function("relation_crc", 3, _relation_crc, deterministic=True)
+        self.jobs = {
+            "consolidate_duplicates": self.consolidate_duplicates,
+            "archive_expired": self.archive_expired,
+            "refresh_summaries": self.refresh_summaries,
+            "validate_integrity": self.validate_integrity,
+            "cleanup_orphaned_relations": self.cleanup_orphaned_relations,
+        }
+
+    # ---- checkpoints -------------------------------------------------------------------------
+
+    def input_signature(self, job: str) -> str:
+        conn = self.store.conn
+        count, versions, last = conn.execute(
+            "SELECT COUNT(*), TOTAL(version), MAX(last_modified) FROM entities").fetchone()
+        # Order-independent checksum: a drop + add that keeps the count still changes it
+        relations, checksum = conn.execute(
+            "SELECT COUNT(*), TOTAL(relation_crc(src, dst, relation_type)) FROM relations").fetchone()
+        signature = f"{count}:{int(versions)}:{last or ''}:{relations}:{int(checksum)}"
+        if job in TIME_DEPENDENT_JOBS:
+            signature += f":{_now().date().isoformat()}"
+        return signature
+
+    def checkpoint(self, job: str) -> Optional[Dict[str, Any]]:
+        row = self.store.conn.execute(
+            "SELECT status, cursor, input_sig, started_at, updated_at, stats FROM maintenance_checkpoints WHERE job = ?",
+            (job,)).fetchone()
+        if row is None:
+            return None
+        return {"job": job, "status": row[0], "cursor": json.loads(row[1]) if row[1] else None,
+                "input_sig": row[2], "started_at": row[3], "updated_at": row[4], "stats": json.loads(row[5])}
+
+    def save_checkpoint(self, job: str, status: str, cursor: Optional[Dict[str, Any]],
+                        input_sig: Optional[str], started_at: str, stats: Dict[str, Any]) -> None:
+        self.store.conn.execute(
+            "INSERT INTO maintenance_checkpoints (job, status, cursor, input_sig, started_at, updated_at, stats) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(job) DO UPDATE SET status = excluded.status, "
+            "cursor = excluded.cursor, input_sig = excluded.input_sig, started_at = excluded.started_at, "
+            "updated_at = excluded.updated_at, stats = excluded.stats",
+            (job, status, json.dumps(cursor) if cursor is not None else None, input_sig, started_at,
+             _iso(_now()), json.dumps(stats)))
+
+    def reset(self, jobs: List[str]) -> None:
+        marks = ",".join("?" * len(jobs))
+        self.store.conn.execute(f"DELETE FROM maintenance_checkpoints WHERE job IN ({marks})", jobs)
+        if "consolidate_duplicates" in jobs:
+            self.store.conn.execute("DELETE FROM maintenance_keys")
+
+    # ---- runner ------------------------------------------------------------------------------
+
+    def run(self, jobs: List[str], budget: Budget) -> List[Dict[str, Any]]:
+        """Run `jobs` in order within `budget`; returns one report per job"""
+        reports = []
+        for job in jobs:
+            if budget.exhausted():
+                reports.append({"job": job, "status": "deferred"})
+                continue
+            reports.append(self.run_job(job, budget))
+        return reports
+
+    def run_job(self, job: str, budget: Budget) -> Dict[str, Any]:
+        state = self.checkpoint(job)
+        signature = self.input_signature(job)
+        if state and state["status"] == "done" and state["input_sig"] == signature:
+            return {"job": job, "status": "skipped", "reason": "inputs unchanged since last run"}
+
+        resuming = bool(state and state["status"] == "running")
+        cursor = state["cursor"] if resuming else None
+        stats: Dict[str, Any] = state["stats"] if resuming else {}
+        started_at = state["started_at"] if resuming else _iso(_now())
+        chunks = 0
+        status = "done"
+
+        for cursor, delta in self.jobs[job](cursor):
+            chunks += 1
+            _accumulate(stats, delta)
+            self.save_checkpoint(job, "running", cursor, None, started_at, stats)
+            if budget.exhausted():
+                status = "paused"
+                break
+            if self.pause:
+                time.sleep(self.pause)
+
+        if status == "done":
+            # Signature after our own writes, so an idle store is not re-processed next window
+            self.save_checkpoint(job, "done", None, self.input_signature(job), started_at, stats)
+        return {"job": job, "status": status, "resumed": resuming, "chunks": chunks, "stats": stats}
+
+    def _scan(self, cursor: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        after = (cursor or {}).get("after", "")
+        while True:
+            page = self.store.scan(after, self.chunk_size)
+            if not page:
+                return
+            after = page[-1]["name"]
+            yield after, page
+
+    # ---- jobs --------------------------------------------------------------------------------
+
+    def consolidate_duplicates(self, cursor):
+        """Phase 1 indexes consolidation keys into maintenance_keys; phase 2 merges each group"""
+        conn = self.store.conn
+        cursor = cursor or {"phase": "scan", "after": ""}
+        if cursor["phase"] == "scan":
+            if not cursor["after"]:
+                conn.execute("DELETE FROM maintenance_keys")
+            for after, page in self._scan(cursor):
+                rows = [(key, e["name"]) for e in page for key in [consolidation_key(e["name"])] if key]
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("INSERT OR IGNORE INTO maintenance_keys (key, name) VALUES (?, ?)", rows)
+                conn.execute("COMMIT")
+                yield {"phase": "scan", "after": after}, {"scanned": len(page)}
+            cursor = {"phase": "merge", "after": ""}
+
+        after = cursor["after"]
+        while True:
+            keys = [k for (k,) in conn.execute(
+                "SELECT key FROM maintenance_keys WHERE key > ? GROUP BY key HAVING COUNT(*) > 1 ORDER BY key LIMIT ?",
+                (after, self.chunk_size)).fetchall()]
+            if not keys:
+                break
+            delta = {"groups": 0, "merged": 0, "conflicts": 0}
+            for key in keys:
+                names = [n for (n,) in conn.execute("SELECT name FROM maintenance_keys WHERE key = ?", (key,))]
+                merged = self._merge_group(key, names)
+                if merged is None:
+                    delta["conflicts"] += 1
+                elif merged:
+                    delta["groups"] += 1
+                    delta["merged"] += merged
+            after = keys[-1]
+            yield {"phase": "merge", "after": after}, delta
+        conn.execute("DELETE FROM maintenance_keys")
+
+    def _merge_group(self, key: str, names: List[str]) -> Optional[int]:
+        """Merge duplicates into one canonical entity; returns entities merged, None on conflict"""
+        entities = list(self.store.read_many(names).values())
+        if len(entities) < 2:
+            return 0
+        # Prefer a name already in canonical form, then the best-observed entity
+        entities.sort(key=lambda e: (e["name"] != key, -len(e["observations"]), e["name"]))
+        canonical, others = entities[0], entities[1:]
+        target = canonical
+        for other in others:
+            target = merge_entities(target, other)
+
+        other_names = {e["name"] for e in others}
+        drop, add = [], []
+        for other in others:
+            for rel in self.store.relations(other["name"]):
+                drop.append(rel)
+                src = canonical["name"] if rel["from"] in other_names else rel["from"]
+                dst = canonical["name"] if rel["to"] in other_names else rel["to"]
+                if src != dst:
+                    add.append({"from": src, "to": dst, "relationType": rel["relationType"]})
+        try:
+            self.store.write_batch([target], add, deletes=[{"name": e["name"], "version": e["version"]} for e in others],
+                                   drop_relations=drop)
+        except VersionConflict:
+            return None
+        return len(others)
+
+    def archive_expired(self, cursor):
+        now = _now().timestamp()
+        for after, page in self._scan(cursor):
+            expired = [e for e in page if e["entityType"] in ARCHIVE_AFTER_DAYS and
+                       now - last_activity(e) > timedelta(days=ARCHIVE_AFTER_DAYS[e["entityType"]]).total_seconds()]
+            delta = {"scanned": len(page), "archived": 0, "conflicts": 0}
+            if expired:
+                try:
+                    self.store.write_batch([], deletes=[{"name": e["name"], "version": e["version"]} for e in expired],
+                                           archive="retention")
+                    delta["archived"] = len(expired)
+                except VersionConflict as exc:
+                    # Touched by a mode since the scan, so no longer expired; archive the rest
+                    moved = {c["name"] for c in exc.conflicts}
+                    keep = [e for e in expired if e["name"] not in moved]
+                    try:
+                        self.store.write_batch([], deletes=[{"name": e["name"], "version": e["version"]} for e in keep],
+                                               archive="retention")
+                        delta["archived"] = len(keep)
+                    except VersionConflict:
+                        keep = []
+                    delta["conflicts"] = len(expired) - len(keep)
+            yield {"after": after}, delta
+
+    def refresh_summaries(self, cursor):
+        conn = self.store.conn
+        previous = (cursor or {}).get("after", "")
+        for after, page in self._scan(cursor):
+            wanted = [e for e in page if e["entityType"] in SUMMARY_TYPES]
+            marks = ",".join("?" * len(wanted))
+            stored = dict(conn.execute(f"SELECT name, version FROM entity_summaries WHERE name IN ({marks})",
+                                       [e["name"] for e in wanted]).fetchall()) if wanted else {}
+            stale = [e for e in wanted if stored.get(e["name"]) != e["version"]]
+            refreshed_at = _iso(_now())
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO entity_summaries (name, entity_type, version, refreshed_at, summary) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(e["name"], e["entityType"], e["version"], refreshed_at, json.dumps(summarize_entity(e))) for e in stale])
+            # Summaries of entities deleted (or archived) within this key range
+            removed = conn.execute(
+                "DELETE FROM entity_summaries WHERE name > ? AND name <= ? AND name NOT IN (SELECT name FROM entities)",
+                (previous, after)).rowcount
+            conn.execute("COMMIT")
+            previous = after
+            yield {"after": after}, {"scanned": len(page), "refreshed": len(stale),
+                                     "unchanged": len(wanted) - len(stale), "removed": removed}
+        conn.execute("DELETE FROM entity_summaries WHERE name > ? AND name NOT IN (SELECT name FROM entities)", (previous,))
+
+    def validate_integrity(self, cursor):
+        conn = self.store.conn
+        for after, page in self._scan(cursor):
+            issues = []
+            for e in page:
+                prefix = e["name"].partition("#")[0]
+                expected = PREFIX_TYPES.get(prefix)
+                if expected is None:
+                    issues.append({"entity": e["name"], "issue": "unknown name prefix"})
+                elif e["entityType"] != expected:
+                    issues.append({"entity": e["name"], "issue": f"type {e['entityType']!r}, expected {expected!r}"})
+                for i, raw in enumerate(e["observations"]):
+                    obs = parse_observation(raw)
+                    if obs is None:
+                        issues.append({"entity": e["name"], "issue": f"observation {i} is not a JSON envelope"})
+                    elif not obs.get("type") or not obs.get("ts"):
+                        issues.append({"entity": e["name"], "issue": f"observation {i} lacks type or ts"})
+            marks = ",".join("?" * len(page))
+            dangling = conn.execute(
+                f"SELECT src, dst, relation_type FROM relations WHERE src IN ({marks}) "
+                "AND dst NOT IN (SELECT name FROM entities)", [e["name"] for e in page]).fetchall()
+            issues += [{"entity": src, "issue": f"{kind} -> missing {dst}"} for src, dst, kind in dangling]
+            yield {"after": after}, {"scanned": len(page), "issues": len(issues), "samples": issues}
+
+    def cleanup_orphaned_relations(self, cursor):
+        conn = self.store.conn
+        after = (cursor or {}).get("rowid", 0)
+        while True:
+            rows = conn.execute("SELECT rowid FROM relations WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                (after, self.chunk_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            # Existence is re-checked inside the delete, so an endpoint created meanwhile is kept
+            conn.execute("BEGIN IMMEDIATE")
+            removed = conn.execute(
+                "DELETE FROM relations WHERE rowid > ? AND rowid <= ? AND ("
+                "NOT EXISTS (SELECT 1 FROM entities WHERE name = relations.src) OR "
+                "NOT EXISTS (SELECT 1 FROM entities WHERE name = relations.dst))", (after, last)).rowcount
+            conn.execute("COMMIT")
+            after = last
+            yield {"rowid": after}, {"scanned": len(rows), "removed": removed}
+
+
+def summarize_entity(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Roll observations up into the statistics named in the lifecycle policy"""
+    by_type: Dict[str, int] = {}
+    stamps = []
+    executions = failures = 0
+    outcomes = {SUCCESS: 0, PARTIAL: 0, FAILED: 0}
+    for raw in entity["observations"]:
+        obs = parse_observation(raw)
+        if obs is None:
+            continue
+        kind, data = obs.get("type", ""), obs_data(obs)
+        by_type[kind] = by_type.get(kind, 0) + 1
+        if obs.get("ts"):
+            stamps.append(obs["ts"])
+        if kind == "command.exec":
+            executions += 1
+            failures += data.get("exitCode") not in (0, None)
+        elif kind == "fix.outcome" and data.get("status") in outcomes:
+            outcomes[data["status"]] += 1
+
+    summary = {"observations": len(entity["observations"]), "by_type": by_type,
+               "first_ts": min(stamps, key=ts_value) if stamps else None,
+               "last_ts": max(stamps, key=ts_value) if stamps else None}
+    if entity["entityType"] == "Command":
+        summary.update(executions=executions, failures=failures,
+                       failure_rate=round(failures / executions, 3) if executions else None)
+    elif entity["entityType"] == "Fix":
+        total = sum(outcomes.values())
+        summary.update(outcomes=outcomes, success_ratio=round(outcomes[SUCCESS] / total, 3) if total else None)
+    return summary
+
+
+def _accumulate(stats: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    for key, value in delta.items():
+        if key == "samples":
+            samples = stats.setdefault("samples", [])
+            samples.extend(value[:MAX_ISSUE_SAMPLES - len(samples)])
+        else:
+            stats[key] = stats.get(key, 0) + value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgeted, resumable memory lifecycle maintenance")
+    parser.add_argument("--db", type=Path, default=Path(".roo/.cache/memory.sqlite"), help="Versioned memory store")
+    parser.add_argument("--schedule", choices=sorted(SCHEDULES), default="daily", help="Job group to run")
+    parser.add_argument("--jobs", help="Comma-separated jobs to run instead of --schedule")
+    parser.add_argument("--budget-seconds", type=float, default=30.0, help="Wall-clock budget per window")
+    parser.add_argument("--budget-cpu", type=float, help="Process CPU budget per window")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Entities (or relations) per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to yield between chunks")
+    parser.add_argument("--reset", action="store_true", help="Discard checkpoints of the selected jobs first")
+    parser.add_argument("--status", action="store_true", help="Print checkpoints and exit")
+
+    args = parser.parse_args()
+
+    runner = MaintenanceRunner(VersionedStore(args.db), chunk_size=args.chunk_size, pause=args.pause)
+    jobs = args.jobs.split(",") if args.jobs else SCHEDULES[args.schedule]
+    unknown = [j for j in jobs if j not in runner.jobs]
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(unknown)}; expected {', '.join(runner.jobs)}")
+
+    if args.status:
+        print(json.dumps([runner.checkpoint(j) or {"job": j, "status": "never run"} for j in jobs], indent=2))
+        return
+    if args.reset:
+        runner.reset(jobs)
+
+    budget = Budget(args.budget_seconds, args.budget_cpu)
+    reports = runner.run(jobs, budget)
+    print(json.dumps({"schedule": None if args.jobs else args.schedule, "budget_used": budget.used(),
+                      "jobs": reports}, indent=2))
+
+    # Exit 2 while work remains so schedulers can re-invoke in the next window
+    if any(r["status"] in ("paused", "deferred") for r in reports):
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
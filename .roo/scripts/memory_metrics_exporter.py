@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Memory Metrics Exporter
+Exports MemoryHealthChecker results in Prometheus text exposition format.
+
+Usage (via memory-health-check.py):
+    python memory-health-check.py --textfile /var/lib/node_exporter/textfile/roo_memory.prom
+    python memory-health-check.py --serve 127.0.0.1:9464 [--interval 60]
+
+Exported series:
+- roo_memory_check_duration_seconds   histogram, per check
+- roo_memory_query_duration_seconds   histogram, every Memory MCP call made by the checker
+- roo_memory_query_p95_seconds        gauge (from metrics), checker calls only; 70-memory-lifecycle-policy.md
+                                      alerts when > 5
+- roo_memory_graph_{entities,relations,observations}   graph size gauges
+- roo_memory_<metric>                 every numeric entry of MemoryHealthChecker.metrics
+- roo_memory_health_score, roo_memory_issues{severity}, roo_memory_last_run_timestamp_seconds
+
+Histograms are cumulative: the textfile writer keeps their counts in a sidecar state file
+next to the .prom file, and the HTTP server keeps them in memory.
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+PREFIX = "roo_memory_"
+# Seconds; upper buckets bracket the 2 s target and the 5 s alert threshold
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+QUERY_P95_ALERT_SECONDS = 5.0
+
+HELP = {
+    "query_p95_seconds": (f"P95 time of the health checker's own read_graph/search_nodes calls in the last run, "
+                          f"not of all Memory MCP traffic (alert threshold {QUERY_P95_ALERT_SECONDS:g} s)."),
+    "graph_entities": "Entities in the memory graph.",
+    "graph_relations": "Relations in the memory graph.",
+    "graph_observations": "Observations across all memory graph entities.",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Histogram:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.series: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, label: str, value: float) -> None:
+        s = self.series.setdefault(label, {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0})
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                s["counts"][i] += 1
+        s["count"] += 1
+        s["sum"] += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"buckets": list(self.buckets), "series": self.series}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        hist = cls()
+        # Bucket layout changed: start over rather than mix incompatible counts
+        if tuple(data.get("buckets", ())) == hist.buckets:
+            hist.series = data.get("series", {})
+        return hist
+
+    def render(self, name: str, help_text: str, label_name: str) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for label, s in sorted(self.series.items()):
+            lbl = f'{label_name}="{_escape(label)}"'
+            for bound, count in zip(self.buckets, s["counts"]):
+                lines.append(f'{name}_bucket{{{lbl},le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{lbl},le="+Inf"}} {s["count"]}')
+            lines.append(f"{name}_sum{{{lbl}}} {s['sum']:.6f}")
+            lines.append(f"{name}_count{{{lbl}}} {s['count']}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _gauge(name: str, help_text: str, samples: List[tuple]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lbl = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        lines.append(f"{name}{{{lbl}}} {value}" if lbl else f"{name} {value}")
+    return lines
+
+
+class MetricsExporter:
+    """Accumulates check/query timings across runs and renders the exposition text"""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.check_hist = Histogram.from_dict(state.get("check_duration_seconds", {}))
+        self.query_hist = Histogram.from_dict(state.get("query_duration_seconds", {}))
+
+    def state(self) -> Dict[str, Any]:
+        return {"check_duration_seconds": self.check_hist.to_dict(),
+                "query_duration_seconds": self.query_hist.to_dict()}
+
+    def render(self, checker) -> str:
+        for check, seconds in checker.check_durations.items():
+            self.check_hist.observe(check, seconds)
+        for query, seconds in checker.query_durations:
+            self.query_hist.observe(query, seconds)
+
+        lines: List[str] = []
+        lines += self.check_hist.render(PREFIX + "check_duration_seconds",
+                                        "Duration of each memory health check.", "check")
+        lines += self.query_hist.render(PREFIX + "query_duration_seconds",
+                                        "Duration of Memory MCP queries issued by the health checks.", "query")
+
+        for key, value in sorted(checker.metrics.items()):
+            if key == "mode_activity":
+                lines += _gauge(PREFIX + "mode_recent_runs", "Recent Run entities per mode.",
+                                [({"mode": mode}, count) for mode, count in sorted(value.items())])
+            elif isinstance(value, bool):
+                lines += _gauge(PREFIX + key, f"Memory health metric {key}.", [({}, int(value))])
+            elif isinstance(value, (int, float)):
+                lines += _gauge(PREFIX + key, HELP.get(key, f"Memory health metric {key}."), [({}, value)])
+
+        severities: Dict[str, int] = {}
+        for item in checker.issues + checker.warnings:
+            severities[item["severity"]] = severities.get(item["severity"], 0) + 1
+        lines += _gauge(PREFIX + "issues", "Open health check findings by severity.",
+                        [({"severity": sev}, n) for sev, n in sorted(severities.items())])
+        lines += _gauge(PREFIX + "health_score", "Overall memory health score (0-100).",
+                        [({}, f"{checker._calculate_health_score():.1f}")])
+        lines += _gauge(PREFIX + "last_run_timestamp_seconds", "Unix time of the last health check run.",
+                        [({}, f"{time.time():.3f}")])
+        return "\n".join(lines) + "\n"
+
+
+def write_textfile(checker, path: Path) -> None:
+    """Write the .prom file atomically, as node-exporter's textfile collector requires"""
+    state_path = path.with_name(f".{path.name}.state.json")
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+
+    exporter = MetricsExporter(state)
+    text = exporter.render(checker)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for target, content in ((state_path, json.dumps(exporter.state())), (path, text)):
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, target)
+
+
+def serve(checker_factory, addr: str, interval: float = 60.0) -> None:
+    """Serve /metrics, re-running the checks at most once per `interval` seconds"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    host, _, port = addr.rpartition(":")
+    exporter = MetricsExporter()
+    lock = threading.Lock()
+    cache = {"text": "", "at": 0.0}
+
+    def scrape() -> str:
+        with lock:
+            if not cache["text"] or time.monotonic() - cache["at"] >= interval:
+                checker = checker_factory()
+                checker.run_all_checks()
+                cache["text"], cache["at"] = exporter.render(checker), time.monotonic()
+            return cache["text"]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = scrape().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+    print(f"Serving memory metrics on http://{host or '127.0.0.1'}:{port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Memory Retrieval Engine
+Runs the 30-memory-reads.md recipes against an indexed copy of the memory graph.
+
+Usage:
+    python memory_retrieval.py --graph graph.json prior-fixes <normalizedKey>
+    python memory_retrieval.py --graph graph.json breakers <cmd#...>
+    python memory_retrieval.py --graph graph.json dependency <dep#name@version>
+    python memory_retrieval.py --graph graph.json evidence <fix#...>
+
+Recipes:
+- A) prior_fixes: (:Fix)-[:RESOLVES]->(err#<key>), soft-match fallback on normalizedKey / stem
+- B) command_breakers: cmd-[:EMITS]->(:Error|:Warning), grouped by key, with a representative fix
+- C) dependency_fixes: (:Error)-[:CAUSED_BY]->(dep), minimal fix set that cleared those errors
+- D) evidence: fix-[:DERIVED_FROM]->(:Doc)-[:REFERENCES]->(:Concept)
+
+Every traversal step reads at most MAX_FANOUT neighbours (most recent first). Candidates are
+ranked evidence-first, then by success ratio, recency and recurrence, with a heap top-K
+(K=3) and name as the deterministic tie-break. Results are cached per recipe and key until
+the next write to the index.
+"""
+
+import re
+import sys
+import json
+import heapq
+import argparse
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+TOP_K = 3
+MAX_FANOUT = 256
+SUCCESS_WEIGHT = {"verified_successful": 1.0, "partially_effective": 0.5, "failed": 0.0}
+# Soft-match stem: drop versions and paths before comparing keys
+STEM_STRIP = re.compile(r"\S*/\S*|\bv?\d+(?:\.[\dx*]+)+\b|\d+")
+
+
+def parse_observation(obs) -> Optional[Dict[str, Any]]:
+    """Observations are envelopes, stored either as dicts or JSON strings; others are ignored"""
+    if isinstance(obs, str):
+        try:
+            obs = json.loads(obs)
+        except ValueError:
+            return None
+    return obs if isinstance(obs, dict) else None
+
+
+def obs_data(obs: Dict[str, Any]) -> Dict[str, Any]:
+    return obs.get("data") if isinstance(obs.get("data"), dict) else obs
+
+
+def ts_value(ts: Optional[str]) -> float:
+    if not ts:
+        return 0.0
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def key_stem(key: str) -> str:
+    return " ".join(STEM_STRIP.sub(" ", key).split())
+
+
+class GraphIndex:
+    """Adjacency and key indexes over a read_graph() result, updated incrementally on write"""
+
+    def __init__(self, graph: Optional[Dict[str, Any]] = None):
+        self.entities: Dict[str, Dict[str, Any]] = {}
+        self.out: Dict[tuple, List[str]] = {}
+        self.inn: Dict[tuple, List[str]] = {}
+        self.by_key: Dict[str, List[str]] = {}
+        self.by_stem: Dict[str, List[str]] = {}
+        self._obs: Dict[str, List[Dict[str, Any]]] = {}
+        self.generation = 0
+        if graph:
+            self.apply_write(graph.get("entities", []), graph.get("relations", []))
+
+    def apply_write(self, entities=(), relations=(), observations=None) -> None:
+        """Mirror create_entities / create_relations / add_observations ({name: [obs]})"""
+        for entity in entities:
+            # create_entities ignores names that already exist
+            if entity["name"] not in self.entities:
+                self.entities[entity["name"]] = {**entity, "observations": []}
+                self._add_observations(self.entities[entity["name"]], entity.get("observations", []))
+        for name, new_obs in (observations or {}).items():
+            if name in self.entities:
+                self._add_observations(self.entities[name], new_obs)
+        for rel in relations:
+            targets = self.out.setdefault((rel["from"], rel["relationType"]), [])
+            if rel["to"] not in targets:
+                targets.append(rel["to"])
+                self.inn.setdefault((rel["to"], rel["relationType"]), []).append(rel["from"])
+        self.generation += 1
+
+    def _add_observations(self, entity: Dict[str, Any], observations) -> None:
+        entity["observations"].extend(observations)
+        parsed = self._obs.setdefault(entity["name"], [])
+        for raw in observations:
+            obs = parse_observation(raw)
+            if obs is None:
+                continue
+            parsed.append(obs)
+            key = obs_data(obs).get("normalizedKey")
+            if key and obs.get("type") in ("error.capture", "warning.capture"):
+                for index, k in ((self.by_key, key), (self.by_stem, key_stem(key))):
+                    names = index.setdefault(k, [])
+                    if entity["name"] not in names:
+                        names.append(entity["name"])
+
+    def observations(self, name: str, obs_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [o for o in self._obs.get(name, []) if obs_type is None or o.get("type") == obs_type]
+
+    def neighbours(self, name: str, relation: str, reverse: bool = False, limit: int = MAX_FANOUT) -> List[str]:
+        """Most recently written neighbours first, at most `limit` of them"""
+        edges = (self.inn if reverse else self.out).get((name, relation), ())
+        return list(islice(reversed(edges), limit))
+
+
+class RetrievalEngine:
+    def __init__(self, index: GraphIndex, k: int = TOP_K, fanout: int = MAX_FANOUT):
+        self.index = index
+        self.k = k
+        self.fanout = fanout
+        self._cache: Dict[tuple, Any] = {}
+        self._cache_generation = index.generation
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _cached(self, recipe: str, key: str, compute):
+        # Any graph write bumps the generation and makes every cached answer stale at once
+        if self._cache_generation != self.index.generation:
+            self._cache.clear()
+            self._cache_generation = self.index.generation
+        if (recipe, key) in self._cache:
+            self.stats["hits"] += 1
+            return self._cache[(recipe, key)]
+        self.stats["misses"] += 1
+        result = self._cache[(recipe, key)] = compute()
+        return result
+
+    def fix_profile(self, fix: str) -> Dict[str, Any]:
+        """Ranking inputs for one fix: evidence, success ratio, last seen, distinct runs"""
+        idx = self.index
+        # Same counting as fix_effectiveness: an outcome recorded both as a fix.outcome observation
+        # and as a HAS_OUTCOME entity counts once; the entity name is only used when it has no observations
+        outcomes = {(obs_data(o).get("status"), o.get("ts")): o for o in idx.observations(fix, "fix.outcome")}
+        statuses = []
+        for outcome in idx.neighbours(fix, "HAS_OUTCOME", limit=self.fanout):
+            own = [o for o in idx.observations(outcome, "fix.outcome") if obs_data(o).get("fixId", fix) == fix]
+            if own:
+                outcomes.update(((obs_data(o).get("status"), o.get("ts")), o) for o in own)
+            elif not idx.observations(outcome, "fix.outcome"):
+                statuses.append(outcome.split("#")[1] if outcome.count("#") >= 2 else None)
+        statuses += [status for status, _ in outcomes]
+        scored = [SUCCESS_WEIGHT[s] for s in statuses if s in SUCCESS_WEIGHT]
+        applies = idx.observations(fix, "fix.apply")
+        docs = idx.neighbours(fix, "DERIVED_FROM", limit=self.fanout)
+        return {
+            "name": fix,
+            "strategy": next((obs_data(o).get("strategy") for o in reversed(applies) if obs_data(o).get("strategy")), None),
+            "evidence": [d for d in docs if d.startswith("doc#")],
+            # Laplace-smoothed so untested fixes sit between proven and failed ones
+            "success_ratio": round((sum(scored) + 1) / (len(scored) + 2), 3),
+            "outcomes": len(scored),
+            "last_ts": max((o.get("ts", "") for o in applies + list(outcomes.values())), default=None),
+            "runs": len(idx.neighbours(fix, "APPLIES", reverse=True, limit=self.fanout)),
+        }
+
+    def top_fixes(self, fixes, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        profiles = (self.fix_profile(f) for f in dict.fromkeys(fixes))
+        return heapq.nsmallest(k or self.k, profiles, key=lambda p: (
+            not p["evidence"], -p["success_ratio"], -ts_value(p["last_ts"]), -p["runs"], p["name"]))
+
+    def error_nodes(self, normalized_key: str) -> List[str]:
+        """Exact `err#`/`warn#` key first, then observations carrying the key, then its stem"""
+        exact = [n for n in (f"err#{normalized_key}", f"warn#{normalized_key}") if n in self.index.entities]
+        return exact or self.index.by_key.get(normalized_key) or self.index.by_stem.get(key_stem(normalized_key), [])
+
+    # A) Prior fixes for an error key
+    def prior_fixes(self, normalized_key: str) -> List[Dict[str, Any]]:
+        def compute():
+            fixes = []
+            for err in self.error_nodes(normalized_key):
+                for rel in ("RESOLVES", "MITIGATES"):
+                    fixes.extend(self.index.neighbours(err, rel, reverse=True, limit=self.fanout))
+                    if len(fixes) >= self.fanout:
+                        break
+            return self.top_fixes(fixes[:self.fanout])
+        return self._cached("prior_fixes", normalized_key, compute)
+
+    # B) What usually breaks this command?
+    def command_breakers(self, command: str) -> List[Dict[str, Any]]:
+        def compute():
+            counts = []
+            for err in self.index.neighbours(command, "EMITS", limit=self.fanout):
+                seen = self.index.observations(err, "error.capture") + self.index.observations(err, "warning.capture")
+                counts.append((max(len(seen), 1), err))
+            top = heapq.nsmallest(self.k, counts, key=lambda c: (-c[0], c[1]))
+            return [{"error": err, "occurrences": n,
+                     "fix": next(iter(self.top_fixes(self.index.neighbours(err, "RESOLVES", reverse=True,
+                                                                         limit=self.fanout), k=1)), None)}
+                    for n, err in top]
+        return self._cached("command_breakers", command, compute)
+
+    # C) Dependency-rooted reading
+    def dependency_fixes(self, dependency: str) -> Dict[str, Any]:
+        def compute():
+            errors = self.index.neighbours(dependency, "CAUSED_BY", reverse=True, limit=self.fanout)
+            covers: Dict[str, set] = {}
+            for err in errors:
+                for fix in self.index.neighbours(err, "RESOLVES", reverse=True, limit=self.fanout):
+                    covers.setdefault(fix, set()).add(err)
+            rank = {p["name"]: i for i, p in enumerate(self.top_fixes(covers, k=len(covers)))}
+            # Greedy set cover: fewest fixes that cleared every error, best-ranked on ties
+            chosen, uncovered = [], set().union(*covers.values()) if covers else set()
+            while uncovered and len(chosen) < self.k:
+                fix = min(covers, key=lambda f: (-len(covers[f] & uncovered), rank[f]))
+                if not covers[fix] & uncovered:
+                    break
+                chosen.append({**self.fix_profile(fix), "clears": sorted(covers[fix] & uncovered)})
+                uncovered -= covers[fix]
+            return {"dependency": dependency, "errors": len(errors), "fixes": chosen, "uncovered": sorted(uncovered)}
+        return self._cached("dependency_fixes", dependency, compute)
+
+    # D) Evidence roll-up for an applied fix
+    def evidence(self, fix: str) -> Dict[str, Any]:
+        def compute():
+            docs = []
+            for doc in self.index.neighbours(fix, "DERIVED_FROM", limit=self.fanout):
+                note = next((obs_data(o) for o in reversed(self.index.observations(doc, "doc.note"))), {})
+                docs.append({"name": doc, "url": note.get("url"), "title": note.get("title"),
+                             "accessed_at": note.get("accessed_at"),
+                             "concepts": sorted(self.index.neighbours(doc, "REFERENCES", limit=self.fanout))})
+            return {"fix": fix, "docs": sorted(docs, key=lambda d: d["name"])}
+        return self._cached("evidence", fix, compute)
+
+
+def render_prior_fixes(normalized_key: str, fixes: List[Dict[str, Any]]) -> str:
+    """Prompt-ready brief in the 30-memory-reads.md format"""
+    lines = [f"PRIOR_FIXES(err#{normalized_key}):", ""]
+    for i, fix in enumerate(fixes, 1):
+        parts = [fix["name"]]
+        if fix.get("strategy"):
+            parts.append(f"Strategy: {fix['strategy']}")
+        if fix.get("evidence"):
+            parts.append(f"Evidence: {', '.join(fix['evidence'])}")
+        lines.append(f"{i}. " + " — ".join(parts))
+    if not fixes:
+        lines.append("(no prior fixes)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory retrieval recipes (30-memory-reads.md)")
+    parser.add_argument("--graph", type=Path, required=True, help="JSON export of read_graph()")
+    parser.add_argument("recipe", choices=["prior-fixes", "breakers", "dependency", "evidence"])
+    parser.add_argument("key", help="normalizedKey, cmd#..., dep#... or fix#... depending on the recipe")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of the prompt-ready brief")
+
+    args = parser.parse_args()
+
+    with open(args.graph, "r", encoding="utf-8") as f:
+        engine = RetrievalEngine(GraphIndex(json.load(f)))
+
+    if args.recipe == "prior-fixes":
+        result = engine.prior_fixes(args.key)
+        if not args.json:
+            print(render_prior_fixes(args.key, result))
+            return
+    elif args.recipe == "breakers":
+        result = engine.command_breakers(args.key)
+    elif args.recipe == "dependency":
+        result = engine.dependency_fixes(args.key)
+    else:
+        result = engine.evidence(args.key)
+    json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+if __name__ == "__main__":
+    main()